@@ -0,0 +1,85 @@
+import httpx
+import orjson
+import os
+import hashlib
+import logging
+from cachetools import TTLCache
+from config import OLLAMA_ENDPOINT, OLLAMA_MODEL
+
+logger = logging.getLogger(__name__)
+
+# Keep the model loaded between requests instead of reloading it after Ollama's idle timeout
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+
+
+class OllamaClient:
+    """Process-wide client for the local Ollama instance"""
+
+    _shared = None
+
+    @classmethod
+    def shared(cls):
+        """Return the single OllamaClient for this process, creating it on first use"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __init__(self):
+        # One long-lived client so every agent reuses the same pooled connections
+        self.session = httpx.AsyncClient(
+            timeout=httpx.Timeout(120.0, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=16, max_connections=32, keepalive_expiry=60)
+        )
+        self.response_cache = TTLCache(maxsize=1024, ttl=3600)
+
+    async def generate(self, prompt):
+        """Generate response using local Ollama instance"""
+        # Identical prompts to the same model get the cached answer
+        cache_key = hashlib.sha256(f"{OLLAMA_MODEL}|{prompt}".encode("utf-8")).hexdigest()
+        cached_response = self.response_cache.get(cache_key)
+        if cached_response is not None:
+            return cached_response
+
+        payload = {
+            "model": OLLAMA_MODEL,
+            "prompt": prompt,
+            "stream": False,
+            "keep_alive": OLLAMA_KEEP_ALIVE,
+            "options": {"num_ctx": 4096}
+        }
+        try:
+            response = await self.session.post(
+                OLLAMA_ENDPOINT,
+                content=orjson.dumps(payload),
+                headers={"Content-Type": "application/json"}
+            )
+            if response.status_code == 200:
+                result = orjson.loads(response.content)
+                text = result.get('response', '')
+                self.response_cache[cache_key] = text
+                return text
+            else:
+                return f"Error: Received status code {response.status_code}"
+        except Exception as e:
+            return f"Error communicating with Ollama: {str(e)}"
+
+    async def warmup(self):
+        """Open a pooled connection and load the model so the first real prompt is hot"""
+        # An empty prompt only loads the model; Ollama returns immediately without generating
+        payload = {"model": OLLAMA_MODEL, "prompt": "", "keep_alive": OLLAMA_KEEP_ALIVE}
+        try:
+            response = await self.session.post(
+                OLLAMA_ENDPOINT,
+                content=orjson.dumps(payload),
+                headers={"Content-Type": "application/json"}
+            )
+            return response.status_code == 200
+        except Exception as e:
+            logger.warning(f"Ollama warmup failed: {str(e)}")
+            return False
+
+    async def close(self):
+        """Close pooled connections and drop the process-wide instance (for the process owner, not individual agents)"""
+        await self.session.aclose()
+        if OllamaClient._shared is self:
+            OllamaClient._shared = None
@@ -1,17 +1,19 @@
-import aiohttp
 import json
+import orjson
 from config import OLLAMA_ENDPOINT, OLLAMA_MODEL
+from agents.ollama_client import OllamaClient
 import logging
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-async def analyze_requirements(prompt):
+async def analyze_requirements(prompt, client=None):
     """
     Analyze requirements using Ollama's local instance
     Args:
         prompt (str): User's input describing their chatbot requirements
+        client (httpx.AsyncClient, optional): Client to use instead of the shared OllamaClient session
     Returns:
         str: Analyzed and structured requirements
     """
@@ -26,22 +28,29 @@ async def analyze_requirements(prompt):
     # Combine system prompt and user prompt
     full_prompt = f"{system_prompt}\n\nUser Request: {prompt}"
 
-    try:
-        async with aiohttp.ClientSession() as session:
-            payload = {
-                "model": OLLAMA_MODEL,
-                "prompt": full_prompt,
-                "stream": False
-            }
+    payload = {
+        "model": OLLAMA_MODEL,
+        "prompt": full_prompt,
+        "stream": False
+    }
+
+    # Fall back to the process-wide pooled session
+    if client is None:
+        client = OllamaClient.shared().session
 
-            async with session.post(OLLAMA_ENDPOINT, json=payload) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    return result.get('response', '')
-                else:
-                    error_msg = f"Error: Received status code {response.status}"
-                    logger.error(error_msg)
-                    return error_msg
+    try:
+        response = await client.post(
+            OLLAMA_ENDPOINT,
+            content=orjson.dumps(payload),
+            headers={"Content-Type": "application/json"}
+        )
+        if response.status_code == 200:
+            result = orjson.loads(response.content)
+            return result.get('response', '')
+        else:
+            error_msg = f"Error: Received status code {response.status_code}"
+            logger.error(error_msg)
+            return error_msg
 
     except Exception as e:
         error_msg = f"Error analyzing requirements: {str(e)}"
@@ -1,29 +1,15 @@
+import asyncio
 from spade.agent import Agent
 from spade.behaviour import CyclicBehaviour
 from spade.message import Message
-import aiohttp
-import json
 from config import OLLAMA_ENDPOINT, OLLAMA_MODEL
+from agents.ollama_client import OllamaClient
 
 class UserInteractionAgent(Agent):
     class InteractionBehaviour(CyclicBehaviour):
         async def generate_response(self, prompt):
             """Generate response using local Ollama instance"""
-            async with aiohttp.ClientSession() as session:
-                payload = {
-                    "model": OLLAMA_MODEL,
-                    "prompt": prompt,
-                    "stream": False
-                }
-                try:
-                    async with session.post(OLLAMA_ENDPOINT, json=payload) as response:
-                        if response.status == 200:
-                            result = await response.json()
-                            return result.get('response', '')
-                        else:
-                            return f"Error: Received status code {response.status}"
-                except Exception as e:
-                    return f"Error communicating with Ollama: {str(e)}"
+            return await self.agent.ollama.generate(prompt)
 
         async def run(self):
             msg = await self.receive(timeout=10)
@@ -47,4 +33,15 @@ class UserInteractionAgent(Agent):
     async def setup(self):
         print(f"User Interaction Agent running with Ollama model: {OLLAMA_MODEL}")
         print(f"Endpoint: {OLLAMA_ENDPOINT}")
+        # Shared with every other agent in this process
+        self.ollama = OllamaClient.shared()
+        # Connect and load the model in the background so startup doesn't wait on the model load
+        self._warmup_task = asyncio.create_task(self.ollama.warmup())
         self.add_behaviour(self.InteractionBehaviour())
+
+    async def stop(self):
+        # The shared OllamaClient stays open for the other agents; only the warmup is ours
+        warmup_task = getattr(self, "_warmup_task", None)
+        if warmup_task is not None and not warmup_task.done():
+            warmup_task.cancel()
+        await super().stop()
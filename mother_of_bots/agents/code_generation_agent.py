@@ -1,22 +1,15 @@
 import logging
-import os
 import json
 import asyncio
 from typing import Dict, Any, Optional
-from dotenv import load_dotenv
 from langchain_community.llms import Ollama
 
-# Load environment variables
-load_dotenv()
+from ..config import OLLAMA_URL, OLLAMA_MODEL, OLLAMA_KEEP_ALIVE
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Get Ollama settings from environment variables
-OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
-OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "deepseek-r1:latest")  # Use deepseek model
-
 # Removed SPADE CodeGenerationAgent - using FastAPI instead
 
 # Standalone Code Generation Agent (no SPADE dependency)
@@ -28,8 +21,13 @@ class StandaloneCodeGenerationAgent:
         self.running = False
         logger.info(f"Standalone {self.name} initialized")
     
-    async def generate_code(self, requirements):
-        """Generate code based on requirements dict or string using LangChain"""
+    async def generate_code(self, requirements, on_token=None):
+        """
+        Generate code based on requirements dict or string using LangChain
+        
+        on_token, if given, is called as on_token(chunk, attempt) for each streamed chunk;
+        a new attempt number means the previous attempt's output was discarded
+        """
         
         # Convert string requirements to dict if needed
         if isinstance(requirements, str):
@@ -56,13 +54,22 @@ class StandaloneCodeGenerationAgent:
                 llm = Ollama(
                     model=OLLAMA_MODEL,
                     base_url=OLLAMA_URL,
+                    keep_alive=OLLAMA_KEEP_ALIVE,
                     temperature=temperature,
                     num_predict=num_predict
                 )
                 
-                # Invoke asynchronously using LangChain
-                logger.info(f"[LangChain] Invoking code generation via LangChain ainvoke()")
-                generated_code = await llm.ainvoke(prompt)
+                # Invoke asynchronously using LangChain, streaming tokens to the caller if requested
+                if on_token is None:
+                    logger.info(f"[LangChain] Invoking code generation via LangChain ainvoke()")
+                    generated_code = await llm.ainvoke(prompt)
+                else:
+                    logger.info(f"[LangChain] Streaming code generation via LangChain astream()")
+                    chunks = []
+                    async for chunk in llm.astream(prompt):
+                        chunks.append(chunk)
+                        on_token(chunk, attempt + 1)
+                    generated_code = "".join(chunks)
                 logger.info(f"[LangChain] Code generation completed via LangChain ({len(generated_code)} chars)")
                 generated_code = generated_code.strip()
                 
@@ -4,10 +4,7 @@ import os
 import subprocess
 from typing import Any, Dict, List
 
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
+from ..config import DEPLOYED_BACKEND_PORT
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -52,7 +49,7 @@ class StandaloneDeployerAgent:
 
             # Start backend on a different port to avoid conflict with main API server
             # Use port 8001 for deployed backends, or check for available port
-            backend_port = os.getenv("DEPLOYED_BACKEND_PORT", "8001")
+            backend_port = DEPLOYED_BACKEND_PORT
             logger.info(f"[Deployer] Starting backend service on port {backend_port}")
             backend_cmd = ["uvicorn", "app:app", "--reload", "--host", "0.0.0.0", "--port", backend_port]
             self.backend_proc = subprocess.Popen(backend_cmd, cwd=backend_dir, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
@@ -69,7 +66,6 @@ class StandaloneDeployerAgent:
                 stderr = self.frontend_proc.stderr.read().decode('utf-8')
                 raise RuntimeError(f"Frontend failed to start: {stderr}")
 
-            backend_port = os.getenv("DEPLOYED_BACKEND_PORT", "8001")
             return {
                 "status": "success",
                 "backend_url": f"http://localhost:{backend_port}",
@@ -102,7 +98,7 @@ class StandaloneDeployerAgent:
 
         await asyncio.sleep(2)
         # Only check port 3000 for frontend, use different port for backend
-        backend_port = int(os.getenv("DEPLOYED_BACKEND_PORT", "8001"))
+        backend_port = int(DEPLOYED_BACKEND_PORT)
         await self._ensure_ports_available([backend_port, 3000])
 
     async def _ensure_ports_available(self, ports: List[int]):
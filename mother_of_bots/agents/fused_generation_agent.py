@@ -0,0 +1,107 @@
+import logging
+import json
+from typing import Dict, Any, Optional
+from langchain_community.llms import Ollama
+
+from ..config import OLLAMA_URL, OLLAMA_MODEL, OLLAMA_KEEP_ALIVE
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class StandaloneFusedGenerationAgent:
+    """Generates backend and UI code in one LLM call instead of one call per agent"""
+
+    def __init__(self, name="StandaloneFusedGenerationAgent"):
+        self.name = name
+        self.running = False
+        logger.info(f"StandaloneFusedGenerationAgent initialized: {name}")
+
+    async def generate(self, requirements) -> Optional[Dict[str, str]]:
+        """
+        Generate backend and UI code from a single prompt
+
+        Args:
+            requirements: Requirements dict or a plain-text request
+
+        Returns:
+            Dict with backend_code and ui_code, or None if the model did not return usable JSON
+            (callers should fall back to the separate code and UI agents)
+        """
+        if isinstance(requirements, str):
+            requirements = {
+                "description": requirements,
+                "type": "direct_request"
+            }
+        prompt = self._create_fused_prompt(requirements)
+
+        try:
+            logger.info(f"[LangChain] Invoking fused backend+UI generation via LangChain (model: {OLLAMA_MODEL})")
+            llm = Ollama(
+                model=OLLAMA_MODEL,
+                base_url=OLLAMA_URL,
+                keep_alive=OLLAMA_KEEP_ALIVE,
+                temperature=0.1,
+                num_predict=5000,  # Room for both the backend and the UI code
+                format="json"  # Constrain the output to a JSON document
+            )
+            response = await llm.ainvoke(prompt)
+        except Exception as e:
+            logger.error(f"Fused generation failed: {str(e)}")
+            return None
+
+        return self._parse_fused_response(response)
+
+    def _create_fused_prompt(self, specs: Dict[str, Any]) -> str:
+        """Create one prompt asking for both the backend and the UI code"""
+
+        # Convert specs to a formatted string for the prompt
+        if "description" in specs and specs.get("type") == "direct_request":
+            specs_text = f"User requirements: {specs['description']}"
+        else:
+            specs_text = json.dumps(specs, indent=2)
+
+        return (
+            "You are an expert full-stack engineer.\n"
+            "Generate a complete application for the requirements below, as two parts:\n"
+            "- backend: a single Python file using FastAPI, SQLAlchemy and Pydantic, returning JSON from REST endpoints\n"
+            "- ui: a single React file styled with TailwindCSS that calls the backend API\n\n"
+            f"## Requirements\n{specs_text}\n\n"
+            "Respond with ONLY a JSON object of the form {\"backend\": \"<python code>\", \"ui\": \"<react code>\"}.\n"
+            "Do not include markdown, code fences or explanations.\n"
+        )
+
+    def _parse_fused_response(self, response: str) -> Optional[Dict[str, str]]:
+        """Extract backend and UI code from the model's JSON envelope"""
+        try:
+            data = json.loads(response.strip())
+        except json.JSONDecodeError as e:
+            logger.warning(f"Fused generation did not return valid JSON: {str(e)}")
+            return None
+
+        backend_code = data.get("backend") if isinstance(data, dict) else None
+        ui_code = data.get("ui") if isinstance(data, dict) else None
+        if not isinstance(backend_code, str) or not isinstance(ui_code, str) or not backend_code.strip() or not ui_code.strip():
+            logger.warning("Fused generation response is missing backend or UI code")
+            return None
+
+        logger.info(f"Fused generation complete: backend {len(backend_code)} chars, UI {len(ui_code)} chars")
+        return {
+            "backend_code": backend_code.strip(),
+            "ui_code": ui_code.strip()
+        }
+
+    async def start(self):
+        """Start the agent"""
+        logger.info(f"Starting StandaloneFusedGenerationAgent: {self.name}")
+        self.running = True
+
+    async def stop(self):
+        """Stop the agent"""
+        logger.info(f"Stopping StandaloneFusedGenerationAgent: {self.name}")
+        self.running = False
+
+    def is_alive(self):
+        """Check if agent is running"""
+        return self.running
@@ -3,16 +3,21 @@ import os
 import json
 from typing import Dict, Any, Optional
 
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
+def _dump_tree(root: str):
+    """Log the generated project layout at DEBUG level (one scandir per directory)"""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    for path in (root, os.path.join(root, "backend"), os.path.join(root, "frontend")):
+        if os.path.isdir(path):
+            with os.scandir(path) as entries:
+                logger.debug("[Integrator] %s: %s", path, [entry.name for entry in entries])
+
+
 class StandaloneIntegratorAgent:
     """Integrates backend and UI code into a deployable project structure."""
 
@@ -45,7 +50,7 @@ class StandaloneIntegratorAgent:
             backend_path = os.path.join(backend_dir, "app.py")
             with open(backend_path, "w") as f:
                 f.write(backend_code)
-            logger.info(f"[Integrator] Backend code written to {backend_path}")
+            logger.debug("[Integrator] Backend code written to %s", backend_path)
 
             # Generate backend requirements
             requirements_path = os.path.join(backend_dir, "requirements.txt")
@@ -61,13 +66,13 @@ class StandaloneIntegratorAgent:
                     f.write("matplotlib>=3.7.0\n")
                 if "requests" in backend_code.lower():
                     f.write("requests>=2.31.0\n")
-            logger.info(f"[Integrator] Backend requirements saved to {requirements_path}")
+            logger.debug("[Integrator] Backend requirements saved to %s", requirements_path)
 
             # Write UI code
             ui_path = os.path.join(frontend_dir, "App.jsx")
             with open(ui_path, "w") as f:
                 f.write(ui_code)
-            logger.info(f"[Integrator] UI code written to {ui_path}")
+            logger.debug("[Integrator] UI code written to %s", ui_path)
 
             # Create index.html
             index_path = os.path.join(frontend_dir, "index.html")
@@ -95,7 +100,7 @@ class StandaloneIntegratorAgent:
     </script>
 </body>
 </html>""")
-            logger.info(f"[Integrator] Frontend index.html created at {index_path}")
+            logger.debug("[Integrator] Frontend index.html created at %s", index_path)
 
             # package.json
             package_json_path = os.path.join(frontend_dir, "package.json")
@@ -116,7 +121,7 @@ class StandaloneIntegratorAgent:
                     },
                 }
                 json.dump(package_json, f, indent=2)
-            logger.info(f"[Integrator] package.json created at {package_json_path}")
+            logger.debug("[Integrator] package.json created at %s", package_json_path)
 
             # README
             readme_path = os.path.join(project_dir, "README.md")
@@ -159,7 +164,7 @@ class StandaloneIntegratorAgent:
 - Frontend UI: http://localhost:3000
 """
                 )
-            logger.info(f"[Integrator] README created at {readme_path}")
+            logger.debug("[Integrator] README created at %s", readme_path)
 
             # config.js for API calls
             config_path = os.path.join(frontend_dir, "config.js")
@@ -184,9 +189,10 @@ export const apiCall = async (endpoint, method = 'GET', data = null) => {
   return await response.json();
 };
 """)
-            logger.info(f"[Integrator] config.js created at {config_path}")
+            logger.debug("[Integrator] config.js created at %s", config_path)
 
-            logger.info("[Integrator] Project integration complete")
+            _dump_tree(project_dir)
+            logger.info(f"[Integrator] Project integration complete: {project_dir}")
             return project_dir
         except Exception as exc:
             logger.error(f"Error integrating project: {exc}")
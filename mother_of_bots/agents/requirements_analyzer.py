@@ -1,24 +1,53 @@
 import logging
-import os
 import json
 from typing import Dict, Any, Optional, Union, Tuple
 from langchain_community.llms import Ollama
 
+from ..config import OLLAMA_URL, OLLAMA_MODEL, OLLAMA_KEEP_ALIVE
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Get Ollama settings from environment variables
-OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
-OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "deepseek-r1:latest")
+# Single-call prompt that analyzes the requirements and answers in one round trip
+COMBINED_PROMPT = """You are a requirements analyst and assistant for a chatbot development platform.
+First, extract the key requirements from the user's message (purpose, target audience,
+key functionalities, constraints, integration requirements, domain, personality).
+Then, based on that analysis, provide a helpful response to the user.
+
+Format your output exactly as:
+### ANALYSIS
+<structured bullet points of the requirements>
+### RESPONSE
+<your helpful response to the user>
+
+User input: {content}
+"""
+
+def split_combined_response(text: str) -> Tuple[str, str]:
+    """
+    Split the output of COMBINED_PROMPT into its analysis and response parts
+    
+    Args:
+        text: The raw text returned by the LLM
+        
+    Returns:
+        A tuple of (analysis, response); if the markers are missing, the whole text is the response
+    """
+    analysis, marker, response = text.partition("### RESPONSE")
+    if not marker:
+        return "", text.strip()
+    analysis = analysis.replace("### ANALYSIS", "", 1).strip()
+    return analysis, response.strip()
 
-async def analyze_requirements(message: str, output_format: str = "text") -> Union[str, Dict[str, Any]]:
+async def analyze_requirements(message: str, output_format: str = "text", on_token=None) -> Union[str, Dict[str, Any]]:
     """
     Analyze user requirements and extract structured information
     
     Args:
         message: The user message to analyze
         output_format: Format for output - "text" (human-readable) or "json" (for code generation)
+        on_token: Optional callback receiving each raw chunk as the model generates it
         
     Returns:
         A formatted string or JSON object containing the analyzed requirements
@@ -68,13 +97,23 @@ Only include categories that apply to the user's request. Be concise but compreh
         llm = Ollama(
             model=OLLAMA_MODEL,
             base_url=OLLAMA_URL,
+            keep_alive=OLLAMA_KEEP_ALIVE,
             temperature=0.1,  # Low temperature for more factual/analytical response
             num_predict=500  # Limit token count for analysis
         )
         
-        # Invoke asynchronously using LangChain
-        logger.info(f"[LangChain] Invoking requirements analysis via LangChain ainvoke()")
-        analysis_text = await llm.ainvoke(prompt)
+        if on_token:
+            # Stream so callers can show the analysis while it is generated
+            logger.info("[LangChain] Streaming requirements analysis via LangChain astream()")
+            chunks = []
+            async for chunk in llm.astream(prompt):
+                chunks.append(chunk)
+                on_token(chunk)
+            analysis_text = "".join(chunks)
+        else:
+            # Invoke asynchronously using LangChain
+            logger.info(f"[LangChain] Invoking requirements analysis via LangChain ainvoke()")
+            analysis_text = await llm.ainvoke(prompt)
         logger.info(f"[LangChain] Requirements analysis completed via LangChain ({len(analysis_text)} chars)")
         analysis_text = analysis_text.strip()
         
@@ -1,34 +1,73 @@
 import logging
 import os
 import json
+import time
 import asyncio
+import hashlib
 from typing import Dict, Any, Optional
-from dotenv import load_dotenv
 from langchain_community.llms import Ollama
 
-# Load environment variables
-load_dotenv()
+from ..config import OLLAMA_URL, OLLAMA_MODEL, OLLAMA_KEEP_ALIVE
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Get Ollama settings from environment variables
-OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
-OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "deepseek-r1:latest")
+# Persistent cache for generated UI code (survives process restarts)
+try:
+    from diskcache import Cache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+    logger.warning("diskcache not available. Generated UI code will not be cached on disk.")
+
+UI_CACHE_DIR = os.path.expanduser(os.getenv("UI_CACHE_DIR", "~/.mob_cache/ui_gen"))
+UI_CACHE_SIZE_LIMIT = 2 << 30  # 2GB
+
+# Maximum number of UI generations allowed to run against Ollama at once
+UI_MAX_CONCURRENT = int(os.getenv("UI_MAX_CONCURRENT", "16"))
+# Requests beyond this many (queued + running) are rejected immediately
+UI_MAX_QUEUE_DEPTH = int(os.getenv("UI_MAX_QUEUE_DEPTH", "32"))
+# Total time budget in seconds for one UI request, shared across all retry attempts
+UI_GENERATION_TIMEOUT = float(os.getenv("UI_GENERATION_TIMEOUT", "300"))
+
+_ui_cache = None
+
+def _get_ui_cache():
+    """Open the shared on-disk UI cache on first use"""
+    global _ui_cache
+    if _ui_cache is None and DISKCACHE_AVAILABLE:
+        try:
+            _ui_cache = Cache(UI_CACHE_DIR, size_limit=UI_CACHE_SIZE_LIMIT)
+        except Exception as e:
+            logger.warning(f"Could not open UI cache at {UI_CACHE_DIR}: {str(e)}")
+    return _ui_cache
+
+class UIGenerationOverloaded(Exception):
+    """Raised when too many UI generation requests are already in flight"""
 
 # Removed SPADE UIGenerationAgent - using FastAPI instead
 
 class StandaloneUIGenerationAgent:
     """A standalone version of UI generation agent that doesn't require SPADE/XMPP"""
     
+    # Shared by all instances: the API creates one agent per request
+    _generation_slots = asyncio.Semaphore(UI_MAX_CONCURRENT)
+    _queue_depth = 0
+    _warmup_task = None
+    
     def __init__(self, name="StandaloneUIGenerationAgent"):
         self.name = name
         self.running = False
         logger.info(f"StandaloneUIGenerationAgent initialized: {name}")
     
-    async def generate_ui_code(self, requirements):
-        """Generate UI code based on the requirements provided"""
+    async def generate_ui_code(self, requirements, on_token=None):
+        """
+        Generate UI code based on the requirements provided
+        
+        on_token, if given, is called as on_token(chunk, attempt) for each streamed chunk;
+        a new attempt number means the previous attempt's output was discarded
+        """
         logger.info(f"StandaloneUIGenerationAgent generating UI code")
         
         # Format requirements if needed
@@ -41,10 +80,43 @@ class StandaloneUIGenerationAgent:
         # Create prompt for UI generation
         prompt = self._create_ui_generation_prompt(requirements)
         
+        # Serve from the on-disk cache if this exact prompt was generated before
+        cache_key = self._cache_key(prompt)
+        cached_code = await self._cache_get(cache_key)
+        if cached_code:
+            logger.info("UI code served from disk cache")
+            if on_token is not None:
+                on_token(cached_code, 1)
+            return cached_code
+        
+        # Shed load with a fast error instead of queueing without bound
+        if StandaloneUIGenerationAgent._queue_depth >= UI_MAX_QUEUE_DEPTH:
+            logger.warning(f"Rejecting UI generation request: {UI_MAX_QUEUE_DEPTH} requests already in flight")
+            raise UIGenerationOverloaded("UI generation is overloaded, retry later")
+        
+        StandaloneUIGenerationAgent._queue_depth += 1
+        try:
+            # Requests run concurrently; the semaphore caps fan-out to Ollama
+            async with self._generation_slots:
+                return await self._generate_with_retries(prompt, cache_key, on_token)
+        finally:
+            StandaloneUIGenerationAgent._queue_depth -= 1
+    
+    async def _generate_with_retries(self, prompt: str, cache_key: str, on_token=None) -> str:
+        """Run the Ollama generation, retrying with different settings if needed"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + UI_GENERATION_TIMEOUT
+        
         # Try up to 3 times with different temperature settings if needed
         for attempt, temp in enumerate([(0.1, 2000), (0.2, 2500), (0.05, 3000)]):
             temperature, num_predict = temp
             
+            # Retries only get whatever is left of the overall budget
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                logger.error(f"UI code generation exceeded its {UI_GENERATION_TIMEOUT}s budget")
+                return f"Failed to generate UI code: timed out after {UI_GENERATION_TIMEOUT} seconds"
+            
             logger.info(f"UI code generation attempt {attempt+1}/3 with temperature={temperature}")
             
             try:
@@ -52,12 +124,17 @@ class StandaloneUIGenerationAgent:
                 llm = Ollama(
                     model=OLLAMA_MODEL,
                     base_url=OLLAMA_URL,
+                    keep_alive=OLLAMA_KEEP_ALIVE,
                     temperature=temperature,
                     num_predict=num_predict
                 )
                 
-                # Invoke asynchronously using LangChain
-                generated_code = await llm.ainvoke(prompt)
+                # Invoke asynchronously using LangChain, streaming tokens to the caller if requested
+                if on_token is None:
+                    generation = llm.ainvoke(prompt)
+                else:
+                    generation = self._stream_generation(llm, prompt, on_token, attempt + 1)
+                generated_code = await asyncio.wait_for(generation, timeout=remaining)
                 generated_code = generated_code.strip()
                 
                 # Format the generated code
@@ -65,6 +142,7 @@ class StandaloneUIGenerationAgent:
                 
                 if len(formatted_code) > 100 and "import" in formatted_code and ("function" in formatted_code or "const" in formatted_code):
                     logger.info(f"UI code generation successful on attempt {attempt+1}")
+                    await self._cache_put(cache_key, formatted_code)
                     return formatted_code
                 else:
                     logger.warning(f"Generated UI code seems incomplete on attempt {attempt+1}")
@@ -72,6 +150,9 @@ class StandaloneUIGenerationAgent:
                     # If this is the last attempt, return what we have
                     if attempt == 2:
                         return formatted_code
+            except asyncio.TimeoutError:
+                logger.error(f"UI code generation attempt {attempt+1} ran past the {UI_GENERATION_TIMEOUT}s budget")
+                return f"Failed to generate UI code: timed out after {UI_GENERATION_TIMEOUT} seconds"
             except Exception as e:
                 logger.error(f"Exception during UI code generation attempt {attempt+1}: {str(e)}")
                 if attempt == 2:
@@ -79,6 +160,43 @@ class StandaloneUIGenerationAgent:
         
         return "Failed to generate UI code after multiple attempts"
     
+    async def _stream_generation(self, llm, prompt: str, on_token, attempt: int) -> str:
+        """Stream one generation attempt, forwarding each chunk to on_token"""
+        chunks = []
+        async for chunk in llm.astream(prompt):
+            chunks.append(chunk)
+            on_token(chunk, attempt)
+        return "".join(chunks)
+    
+    def _cache_key(self, prompt: str) -> str:
+        """Build the cache key; includes the model so a model change invalidates entries"""
+        return hashlib.sha256(f"{OLLAMA_MODEL}|{prompt}".encode("utf-8")).hexdigest()
+    
+    async def _cache_get(self, key: str) -> Optional[str]:
+        """Look up generated UI code in the disk cache without blocking the event loop"""
+        cache = _get_ui_cache()
+        if cache is None:
+            return None
+        try:
+            entry = await asyncio.to_thread(cache.get, key)
+        except Exception as e:
+            logger.warning(f"UI cache lookup failed: {str(e)}")
+            return None
+        if entry:
+            ui_code, created_ts, model_id = entry
+            return ui_code
+        return None
+    
+    async def _cache_put(self, key: str, ui_code: str):
+        """Store generated UI code in the disk cache without blocking the event loop"""
+        cache = _get_ui_cache()
+        if cache is None:
+            return
+        try:
+            await asyncio.to_thread(cache.set, key, (ui_code, time.time(), OLLAMA_MODEL))
+        except Exception as e:
+            logger.warning(f"UI cache store failed: {str(e)}")
+    
     def _create_ui_generation_prompt(self, specs: Dict[str, Any]) -> str:
         """Create a detailed prompt for UI code generation based on specs"""
         
@@ -138,6 +256,24 @@ class StandaloneUIGenerationAgent:
         """Start the agent"""
         logger.info(f"Starting StandaloneUIGenerationAgent: {self.name}")
         self.running = True
+        
+        # Warm the model once per process so the first real request doesn't pay the load
+        if StandaloneUIGenerationAgent._warmup_task is None:
+            StandaloneUIGenerationAgent._warmup_task = asyncio.create_task(self._warmup())
+    
+    async def _warmup(self):
+        """Send a one-token request so Ollama loads the model weights ahead of time"""
+        try:
+            llm = Ollama(
+                model=OLLAMA_MODEL,
+                base_url=OLLAMA_URL,
+                keep_alive=OLLAMA_KEEP_ALIVE,
+                num_predict=1
+            )
+            await llm.ainvoke("ping")
+            logger.info(f"Ollama model {OLLAMA_MODEL} warmed up")
+        except Exception as e:
+            logger.warning(f"Ollama warmup failed: {str(e)}")
     
     async def stop(self):
         """Stop the agent"""
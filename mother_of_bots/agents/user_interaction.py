@@ -1,27 +1,67 @@
 import json
 import logging
 import os
+import re
 import asyncio
 import time
-import uuid
-from dotenv import load_dotenv
+import hashlib
+import itertools
+from collections import deque
+from cachetools import TTLCache
 from langchain_community.llms import Ollama
-from agents.requirements_analyzer import analyze_requirements, analyze_and_format_for_code_generation
-from agents.code_generation_agent import StandaloneCodeGenerationAgent
-
-# Load environment variables
-load_dotenv()
+from .requirements_analyzer import analyze_requirements, analyze_and_format_for_code_generation, COMBINED_PROMPT, split_combined_response
+from .code_generation_agent import StandaloneCodeGenerationAgent
+from ..config import OLLAMA_URL as OLLAMA_BASE_URL, OLLAMA_MODEL, OLLAMA_KEEP_ALIVE
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Ollama configuration
-OLLAMA_BASE_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
-OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "deepseek-r1:latest")
+# LLM response cache settings
+RESPONSE_CACHE_SIZE = 1024
+RESPONSE_CACHE_TTL = 3600  # 1 hour
+
+# How long a generated response is kept for get_response (seconds)
+RESPONSE_TTL = 300  # 5 minutes
+# Maximum number of stored responses; the least recently used are evicted beyond this
+RESPONSE_STORE_SIZE = 2048
+# How often expired responses are swept while any are stored (seconds)
+RESPONSE_SWEEP_INTERVAL = 60
+
+# Maximum number of queued messages processed concurrently per pass
+MAX_BATCH_SIZE = 8
+
+# Run requirements analysis as its own Ollama call (slower, useful when debugging the analysis)
+SEPARATE_ANALYSIS_CALL = os.getenv("SEPARATE_ANALYSIS_CALL", "false").lower() == "true"
+
+# Detects explicit code generation requests ("generate code", "create code")
+_CODE_RE = re.compile(r"(?i)\b(?:generate|create)\s+code\b")
+# Only the start of a message is scanned; attached document context follows the user's text
+CODE_REQUEST_SCAN_CHARS = 512
 
 # Removed SPADE UserInteractionAgent - using FastAPI instead
 
+class _ResponseStore(TTLCache):
+    """TTLCache that reports every removed message id so its partial stream is dropped too"""
+    
+    def __init__(self, maxsize, ttl, on_evict):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self._on_evict = on_evict
+    
+    def expire(self, time=None):
+        # Also runs inside __setitem__, which would otherwise drop expired ids silently
+        expired = super().expire(time)
+        for message_id, _ in expired:
+            self._on_evict(message_id)
+        return expired
+    
+    def __delitem__(self, message_id):
+        # Size eviction (popitem) and pop() both end up here
+        try:
+            super().__delitem__(message_id)
+        finally:
+            self._on_evict(message_id)
+
 # Standalone User Interaction Agent (no SPADE dependency)
 class StandaloneUserInteractionAgent:
     """Standalone version of the agent for use without SPADE/XMPP"""
@@ -29,58 +69,152 @@ class StandaloneUserInteractionAgent:
     def __init__(self, name="StandaloneUserInteractionAgent"):
         self.name = name
         self.running = False
-        self.message_queue = asyncio.Queue()
-        self.direct_responses = {}  # Store responses for direct queries
-        self.response_timestamps = {}  # Track when responses were generated
+        # Single consumer, so a plain deque plus a wakeup event replaces asyncio.Queue
+        self.message_queue = deque()
+        self._has_messages = asyncio.Event()
+        # Store responses for direct queries: msg_id -> response, bounded in size and age
+        self.direct_responses = _ResponseStore(RESPONSE_STORE_SIZE, RESPONSE_TTL, self._discard_partial)
+        self._waiters = {}  # Futures resolved when a message's response is ready
+        self.partial_responses = {}  # msg_id -> response chunks streamed so far
+        self._partial_updates = {}  # msg_id -> event set whenever new chunks arrive
+        self._llm = None  # Shared LLM client, created in start()
+        self._code_agent = None  # Long-lived code generation agent, created in start()
+        self._response_cache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+        self._inflight = {}  # cache key -> future for generations currently running
+        self._loop = None  # Event loop the agent runs on, captured in start()
+        # Cheap unique message ids: per-process nonce plus a monotonic counter
+        self._id_seq = itertools.count()
+        self._id_nonce = f"{os.getpid()}-{int(time.time())}"
         logger.info(f"Standalone Agent {self.name} initialized")
         
-    async def generate_response(self, prompt):
-        """Generate response using LangChain Ollama LLM"""
-        logger.info(f"Generating response for prompt: {prompt[:30]}...")
+    async def generate_response(self, prompt, message_id=None, stream_after=None):
+        """
+        Generate response using LangChain Ollama LLM
         
+        Tokens are streamed from Ollama. If message_id is given, they are published to
+        partial_responses as they arrive; with stream_after, only text following that
+        marker is published.
+        """
+        logger.info("Generating response for prompt: %.30s...", prompt)
+        
+        # Identical prompts to the same model get the cached answer
+        cache_key = hashlib.sha256(f"{OLLAMA_MODEL}|{prompt}".encode("utf-8")).hexdigest()
+        cached_response = self._response_cache.get(cache_key)
+        if cached_response is not None:
+            logger.info("Response served from cache")
+            return cached_response
+        
+        # Identical prompts already being generated share that generation
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            logger.info("Identical prompt already in flight, waiting for its response")
+            return await asyncio.shield(inflight)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
         try:
-            # Use LangChain Ollama LLM
-            logger.info(f"[LangChain] Initializing Ollama LLM via LangChain for user interaction (model: {OLLAMA_MODEL})")
-            llm = Ollama(
-                model=OLLAMA_MODEL,
-                base_url=OLLAMA_BASE_URL
-            )
+            response = await self._stream_llm_response(prompt, cache_key, message_id, stream_after)
+            future.set_result(response)
+            return response
+        finally:
+            if not future.done():
+                future.cancel()
+            del self._inflight[cache_key]
+    
+    async def _stream_llm_response(self, prompt, cache_key, message_id=None, stream_after=None):
+        """Stream a response from Ollama, publishing chunks for message_id if given"""
+        try:
+            # Reuse the agent's LangChain Ollama LLM instead of building one per call
+            llm = self._get_llm()
             
-            logger.info(f"[LangChain] Invoking response generation via LangChain ainvoke() at: {OLLAMA_BASE_URL}")
-            # Invoke asynchronously using LangChain
-            response = await llm.ainvoke(prompt)
-            logger.info(f"[LangChain] Response generation completed via LangChain ({len(response)} chars)")
-            return response.strip()
+            logger.info("[LangChain] Streaming response generation via LangChain astream() at: %s", OLLAMA_BASE_URL)
+            chunks = []
+            pending = ""  # Text held back until the stream_after marker shows up
+            publishing = stream_after is None
+            async for token in llm.astream(prompt):
+                chunks.append(token)
+                if message_id is None:
+                    continue
+                if not publishing:
+                    pending += token
+                    marker_pos = pending.find(stream_after)
+                    if marker_pos < 0:
+                        continue
+                    publishing = True
+                    token = pending[marker_pos + len(stream_after):]
+                    pending = ""
+                if token:
+                    self._publish_partial(message_id, token)
+            response = "".join(chunks)
+            logger.info("[LangChain] Response generation completed via LangChain (%d chars)", len(response))
+            response = response.strip()
+            self._response_cache[cache_key] = response
+            return response
         except Exception as e:
             error_msg = f"Error communicating with Ollama: {str(e)}"
             logger.error(error_msg)
             return error_msg
     
+    def _publish_partial(self, message_id, chunk):
+        """Append a streamed chunk for a message and wake any stream readers"""
+        self.partial_responses.setdefault(message_id, []).append(chunk)
+        update = self._partial_updates.get(message_id)
+        if update is not None:
+            update.set()
+    
+    def _discard_partial(self, message_id):
+        """Forget streamed chunks for a message, waking readers so they can finish"""
+        self.partial_responses.pop(message_id, None)
+        update = self._partial_updates.pop(message_id, None)
+        if update is not None:
+            update.set()
+    
+    def _get_llm(self):
+        """Return the shared LangChain Ollama LLM, creating it on first use"""
+        if self._llm is None:
+            logger.info(f"[LangChain] Initializing Ollama LLM via LangChain for user interaction (model: {OLLAMA_MODEL})")
+            self._llm = Ollama(
+                model=OLLAMA_MODEL,
+                base_url=OLLAMA_BASE_URL,
+                keep_alive=OLLAMA_KEEP_ALIVE,
+                num_ctx=4096
+            )
+        return self._llm
+    
+    async def _warmup(self):
+        """Send an empty prompt so Ollama loads the model before the first user message"""
+        try:
+            await self._get_llm().ainvoke("")
+            logger.info(f"Ollama model {OLLAMA_MODEL} pre-loaded")
+        except Exception as e:
+            logger.warning(f"Ollama warmup failed: {str(e)}")
+    
     async def handle_code_generation_request(self, prompt):
         """Handle a code generation request by analyzing requirements and generating code"""
-        logger.info(f"Handling code generation request: {prompt[:30]}...")
+        logger.info("Handling code generation request: %.30s...", prompt)
         
         try:
             # Step 1: Analyze the requirements
             req_text, req_json = await analyze_and_format_for_code_generation(prompt)
-            logger.info(f"Requirements analysis complete: {list(req_json.keys()) if isinstance(req_json, dict) else 'Failed'}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Requirements analysis complete: %s", list(req_json.keys()) if isinstance(req_json, dict) else 'Failed')
             
-            # Step 2: Generate code using standalone agent
-            code_agent = StandaloneCodeGenerationAgent()
-            await code_agent.start()
+            # Step 2: Generate code using the long-lived code generation agent
+            if self._code_agent is None:
+                self._code_agent = StandaloneCodeGenerationAgent()
+                await self._code_agent.start()
             
-            try:
-                # Generate code based on requirements
-                if isinstance(req_json, dict) and req_json:
-                    code = await code_agent.generate_code(req_json)
-                else:
-                    # Fallback to direct text if JSON parsing failed
-                    code = await code_agent.generate_code(prompt)
-                
-                logger.info(f"Code generation complete: {len(code)} characters")
-                
-                # Format a nice response with the requirements analysis and the code
-                response = f"""## Requirements Analysis
+            # Generate code based on requirements
+            if isinstance(req_json, dict) and req_json:
+                code = await self._code_agent.generate_code(req_json)
+            else:
+                # Fallback to direct text if JSON parsing failed
+                code = await self._code_agent.generate_code(prompt)
+            
+            logger.info("Code generation complete: %d characters", len(code))
+            
+            # Format a nice response with the requirements analysis and the code
+            response = f"""## Requirements Analysis
 {req_text}
 
 ## Generated Code
@@ -88,106 +222,185 @@ class StandaloneUserInteractionAgent:
 {code}
 ```
 """
-                return response
-                
-            finally:
-                await code_agent.stop()
+            return response
                 
         except Exception as e:
             error_msg = f"Error during code generation: {str(e)}"
             logger.error(error_msg)
             return error_msg
     
+    async def handle_message(self, message):
+        """Generate and store the response for a single queued message"""
+        try:
+            logger.info("Processing message: %s", message)
+            
+            # Step 1: Begin processing message
+            logger.info("Step 1: Begin processing user input")
+            
+            # Check if this is a code generation request
+            is_code_request = bool(_CODE_RE.search(message["content"], 0, CODE_REQUEST_SCAN_CHARS))
+            
+            if is_code_request:
+                # Handle as a code generation request
+                response = await self.handle_code_generation_request(message["content"])
+            elif not SEPARATE_ANALYSIS_CALL:
+                # Step 2: Analyze requirements and answer in a single Ollama call
+                logger.info("Step 2: Analyzing requirements and generating response")
+                combined = await self.generate_response(
+                    COMBINED_PROMPT.format(content=message["content"]),
+                    message_id=message["id"],
+                    stream_after="### RESPONSE"
+                )
+                requirements_analysis, response = split_combined_response(combined)
+                logger.info("Requirements analysis: %.100s...", requirements_analysis)
+            else:
+                # Step 2: Analyze requirements from user input
+                logger.info("Step 2: Analyzing requirements from user input")
+                requirements_analysis = await analyze_requirements(message["content"])
+                logger.info("Requirements analysis: %.100s...", requirements_analysis)
+                
+                # Step 3: Generate response based on analyzed requirements and original input
+                enhanced_prompt = f"""Original user input: {message["content"]}
+                
+Requirements analysis: {requirements_analysis}
+
+Based on the above requirements, please provide a helpful response:"""
+                
+                # Generate response with enhanced prompt
+                response = await self.generate_response(enhanced_prompt, message_id=message["id"])
+            
+            # Store response for direct queries
+            self._store_response(message["id"], response)
+            
+            # Wake up anyone waiting in get_response
+            waiter = self._waiters.pop(message["id"], None)
+            if waiter and not waiter.done():
+                waiter.set_result(response)
+            update = self._partial_updates.get(message["id"])
+            if update is not None:
+                update.set()
+            
+            # Log the response
+            logger.info("Generated response: %.100s...", response)
+            
+            # In a real system, we would send the response back to the sender
+            logger.info("Response ready for %s (Message ID: %s)", message['sender'], message['id'])
+        except Exception as e:
+            logger.error("Error processing message %s: %s", message.get('id'), e)
+            # Resolve the waiter too, so get_response doesn't hang until its timeout
+            error_msg = f"Error processing message: {str(e)}"
+            self._store_response(message["id"], error_msg)
+            waiter = self._waiters.pop(message["id"], None)
+            if waiter and not waiter.done():
+                waiter.set_result(error_msg)
+            self._discard_partial(message["id"])
+    
     async def process_messages(self):
         """Process messages from the queue"""
         while self.running:
             try:
-                # Get message from queue with timeout
+                # Sleep until a message arrives or the next expiry sweep is due
                 try:
-                    message = await asyncio.wait_for(self.message_queue.get(), timeout=1.0)
-                    logger.info(f"Processing message: {message}")
-                    
-                    # Step 1: Begin processing message
-                    logger.info("Step 1: Begin processing user input")
-                    
-                    # Check if this is a code generation request
-                    is_code_request = "generate code" in message["content"].lower() or "create code" in message["content"].lower()
-                    
-                    if is_code_request:
-                        # Handle as a code generation request
-                        response = await self.handle_code_generation_request(message["content"])
-                    else:
-                        # Step 2: Analyze requirements from user input
-                        logger.info("Step 2: Analyzing requirements from user input")
-                        requirements_analysis = await analyze_requirements(message["content"])
-                        logger.info(f"Requirements analysis: {requirements_analysis[:100]}...")
-                        
-                        # Step 3: Generate response based on analyzed requirements and original input
-                        enhanced_prompt = f"""Original user input: {message["content"]}
-                        
-Requirements analysis: {requirements_analysis}
-
-Based on the above requirements, please provide a helpful response:"""
-                        
-                        # Generate response with enhanced prompt
-                        response = await self.generate_response(enhanced_prompt)
-                    
-                    # Store response for direct queries
-                    self.direct_responses[message["id"]] = response
-                    self.response_timestamps[message["id"]] = time.time()
+                    await asyncio.wait_for(self._has_messages.wait(), timeout=self._next_expiry_delay())
                     
-                    # Log the response
-                    logger.info(f"Generated response: {response[:100]}...")
+                    # Drain whatever else is already queued so their Ollama calls overlap
+                    batch = []
+                    while len(batch) < MAX_BATCH_SIZE and self.message_queue:
+                        batch.append(self.message_queue.popleft())
+                    if not self.message_queue:
+                        self._has_messages.clear()
                     
-                    # In a real system, we would send the response back to the sender
-                    logger.info(f"Response ready for {message['sender']} (Message ID: {message['id']})")
-                    
-                    # Mark task as done
-                    self.message_queue.task_done()
+                    await asyncio.gather(*(self.handle_message(m) for m in batch))
                 except asyncio.TimeoutError:
                     # No message received within timeout
                     pass
                 
                 # Clean up old responses older than 5 minutes
-                current_time = time.time()
-                expired_keys = []
-                
-                for msg_id, timestamp in self.response_timestamps.items():
-                    if current_time - timestamp > 300:  # 5 minutes
-                        expired_keys.append(msg_id)
-                
-                for msg_id in expired_keys:
-                    if msg_id in self.direct_responses:
-                        del self.direct_responses[msg_id]
-                    if msg_id in self.response_timestamps:
-                        del self.response_timestamps[msg_id]
+                self._expire_responses()
                 
             except Exception as e:
-                logger.error(f"Error processing message: {str(e)}")
+                logger.error("Error processing message: %s", e)
     
     def add_message(self, sender, content):
-        """Add a message to the queue"""
-        message_id = f"{sender}_{uuid.uuid4()}"
-        self.message_queue.put_nowait({
+        """Add a message to the queue (callable from any thread once the agent is started)"""
+        message_id = f"{sender}_{self._id_nonce}_{next(self._id_seq)}"
+        self._waiters[message_id] = self._loop.create_future()
+        self._partial_updates[message_id] = asyncio.Event()
+        self.message_queue.append({
             "id": message_id,
             "sender": sender,
             "content": content,
             "timestamp": time.time()
         })
-        logger.info(f"Message from {sender} added to queue with ID: {message_id}")
+        # asyncio.Event isn't thread-safe, so wake the processor from the agent's own loop
+        self._loop.call_soon_threadsafe(self._has_messages.set)
+        logger.info("Message from %s added to queue with ID: %s", sender, message_id)
         return message_id
     
+    def _store_response(self, message_id, response):
+        """Store a response (or refresh its expiry if already stored)"""
+        self.direct_responses[message_id] = response
+    
+    def _expire_responses(self):
+        """Drop expired responses along with any partial streams they still hold"""
+        self.direct_responses.expire()
+    
+    def _next_expiry_delay(self):
+        """Seconds until the next expiry sweep, or None if nothing is stored"""
+        if not self.direct_responses:
+            return None
+        return RESPONSE_SWEEP_INTERVAL
+    
     async def get_response(self, message_id, timeout=30):
         """Get response for a specific message"""
-        start_time = time.time()
-        while time.time() - start_time < timeout:
+        if message_id in self.direct_responses:
+            response = self.direct_responses[message_id]
+            # Update timestamp but keep the response
+            self._store_response(message_id, response)
+            return response
+        
+        waiter = self._waiters.get(message_id)
+        if waiter is None:
+            return "No response generated in time. Please try again."
+        
+        try:
+            # Shield so a timeout here doesn't cancel the future for other waiters
+            return await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except asyncio.TimeoutError:
+            self._waiters.pop(message_id, None)
+            return "No response generated in time. Please try again."
+        
+    async def get_response_stream(self, message_id, timeout=30):
+        """Yield the response for a message incrementally as it is generated"""
+        update = self._partial_updates.get(message_id)
+        sent = 0
+        while True:
+            if update is not None:
+                update.clear()
+            
+            chunks = self.partial_responses.get(message_id, [])
+            if len(chunks) > sent:
+                yield "".join(chunks[sent:])
+                sent = len(chunks)
+            
             if message_id in self.direct_responses:
-                response = self.direct_responses[message_id]
-                # Update timestamp but keep the response
-                self.response_timestamps[message_id] = time.time()
-                return response
-            await asyncio.sleep(0.5)
-        return "No response generated in time. Please try again."
+                # Nothing was streamed (e.g. cached or code generation), send it whole
+                if sent == 0:
+                    yield self.direct_responses[message_id]
+                self._discard_partial(message_id)
+                return
+            
+            if update is None or message_id not in self._partial_updates:
+                if sent == 0:
+                    yield "No response generated in time. Please try again."
+                return
+            
+            try:
+                await asyncio.wait_for(update.wait(), timeout)
+            except asyncio.TimeoutError:
+                if sent == 0:
+                    yield "No response generated in time. Please try again."
+                return
         
     async def start(self):
         """Start the agent"""
@@ -196,6 +409,12 @@ Based on the above requirements, please provide a helpful response:"""
         logger.info(f"Endpoint: {OLLAMA_BASE_URL}")
         
         self.running = True
+        self._loop = asyncio.get_running_loop()
+        # Pre-load the model in the background so the first message doesn't wait for it
+        self._warmup_task = asyncio.create_task(self._warmup())
+        # Keep one code generation agent for the lifetime of this agent
+        self._code_agent = StandaloneCodeGenerationAgent()
+        await self._code_agent.start()
         # Start message processing task
         self.process_task = asyncio.create_task(self.process_messages())
         
@@ -214,9 +433,14 @@ Based on the above requirements, please provide a helpful response:"""
                 await self.process_task
             except asyncio.CancelledError:
                 pass
-            
+        
+        if self._code_agent is not None:
+            await self._code_agent.stop()
+            self._code_agent = None
+        
+        self._llm = None
         logger.info(f"Agent {self.name} stopped")
         
     def is_alive(self):
         """Check if the agent is running"""
-        return self.running 
\ No newline at end of file
+        return self.running
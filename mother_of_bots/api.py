@@ -4,31 +4,49 @@ Replaces SPADE with REST API endpoints
 """
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, Union
+import asyncio
+import functools
 import logging
 import os
-from dotenv import load_dotenv
+import re
+import traceback
+import uuid
+import orjson
 
+from .config import OLLAMA_URL, OLLAMA_MODEL, API_PORT, MOB_FUSED
+from .cache import (
+    get_project, put_project, project_dir_key, restore_project_dir, store_project_dir
+)
 # Import standalone agents
 from .agents.requirements_analyzer import analyze_requirements, analyze_and_format_for_code_generation
 from .agents.code_generation_agent import StandaloneCodeGenerationAgent
-from .agents.ui_generation_agent import StandaloneUIGenerationAgent
+from .agents.ui_generation_agent import StandaloneUIGenerationAgent, UIGenerationOverloaded
 from .agents.integrator_agent import StandaloneIntegratorAgent
+from .agents.fused_generation_agent import StandaloneFusedGenerationAgent
 from .agents.deployer_agent import StandaloneDeployerAgent
 
-# Load environment variables
-load_dotenv()
-
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Keywords (matched as substrings) that make the full workflow generate UI code
+_UI_KEYWORDS = ("ui", "interface", "frontend", "react", "vue", "angular", "web page", "website",
+                "chatbot", "chat", "conversational", "user interface", "dashboard", "bot",
+                "create", "build", "generate", "make")
+# Chatbot requests always get a UI
+_CHATBOT_KEYWORDS = ("chatbot", "chat bot", "conversational", "bot", "assistant")
+# One precompiled pass over the combined text instead of a substring scan per keyword
+_NEEDS_UI_RE = re.compile("|".join(map(re.escape, _CHATBOT_KEYWORDS + _UI_KEYWORDS)))
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Mother of Bots API",
     description="REST API for multi-agent code generation system using LangChain",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse  # Faster serialization of large generated-code payloads
 )
 
 # Add CORS middleware to allow Streamlit to call the API
@@ -40,6 +58,42 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Generation agents hold no per-request state, so one started instance of each is
+# shared by all requests for the life of the process
+_agent_pool = {}
+_agent_pool_lock = asyncio.Lock()
+
+async def _get_pooled(name, agent_cls):
+    """Return the shared, started agent for name, creating it on first use"""
+    agent = _agent_pool.get(name)
+    if agent is None:
+        async with _agent_pool_lock:
+            agent = _agent_pool.get(name)
+            if agent is None:
+                agent = agent_cls()
+                await agent.start()
+                _agent_pool[name] = agent
+    return agent
+
+# Background deployments started by the full project workflow, keyed by a per-run deployment id.
+# Entries are dropped once their result has been read; finished ones nobody polled are pruned
+# when the table grows past MAX_DEPLOYMENTS.
+_deployments = {}
+MAX_DEPLOYMENTS = int(os.getenv("MOB_MAX_DEPLOYMENTS", "32"))
+
+def _prune_deployments():
+    """Drop finished deployments that were never polled once the table is over MAX_DEPLOYMENTS"""
+    if len(_deployments) < MAX_DEPLOYMENTS:
+        return
+    for deployment_id in [key for key, task in _deployments.items() if task.done()]:
+        del _deployments[deployment_id]
+
+@app.on_event("shutdown")
+async def stop_agent_pool():
+    """Stop every pooled agent when the API shuts down"""
+    await asyncio.gather(*(agent.stop() for agent in _agent_pool.values()), return_exceptions=True)
+    _agent_pool.clear()
+
 # Pydantic models for request/response
 class RequirementsRequest(BaseModel):
     message: str
@@ -77,8 +131,8 @@ async def health():
     return {
         "status": "healthy",
         "langchain": "active",
-        "ollama_url": os.getenv("OLLAMA_URL", "http://localhost:11434"),
-        "ollama_model": os.getenv("OLLAMA_MODEL", "deepseek-r1:latest")
+        "ollama_url": OLLAMA_URL,
+        "ollama_model": OLLAMA_MODEL
     }
 
 # Requirements Analysis Endpoint
@@ -105,6 +159,69 @@ async def analyze_requirements_endpoint(request: RequirementsRequest):
         logger.error(f"[API] Error analyzing requirements: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error analyzing requirements: {str(e)}")
 
+def _ndjson_response(run):
+    """
+    Stream a workflow's events as newline-delimited JSON
+    
+    Args:
+        run: Callable taking an emit(event) callback and returning an awaitable workflow result
+        
+    Returns:
+        StreamingResponse with the emitted events, then {"event": "result", "data": ...}
+        or {"event": "error", "detail": ...}
+    """
+    events = asyncio.Queue()
+    
+    async def run_workflow():
+        try:
+            result = await run(events.put_nowait)
+            events.put_nowait({"event": "result", "data": result})
+        except HTTPException as e:
+            events.put_nowait({"event": "error", "detail": e.detail})
+        except Exception as e:
+            events.put_nowait({"event": "error", "detail": str(e)})
+        finally:
+            events.put_nowait(None)
+    
+    async def event_stream():
+        task = asyncio.create_task(run_workflow())
+        try:
+            while (event := await events.get()) is not None:
+                yield orjson.dumps(event) + b"\n"
+        finally:
+            # Client went away before the workflow finished
+            if not task.done():
+                task.cancel()
+    
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+@app.post("/api/analyze-requirements/stream")
+async def analyze_requirements_stream_endpoint(request: RequirementsRequest):
+    """
+    Same as /api/analyze-requirements, streamed as newline-delimited JSON events
+    
+    Args:
+        request: RequirementsRequest with message and output_format
+        
+    Returns:
+        Events {"event": "token", "text": chunk} while the analysis is generated,
+        then {"event": "result", "data": ...} or {"event": "error", "detail": ...}
+    """
+    async def run(emit):
+        logger.info(f"[API] Analyzing requirements (streamed): {request.message[:50]}...")
+        result = await analyze_requirements(
+            request.message,
+            request.output_format,
+            on_token=lambda chunk: emit({"event": "token", "text": chunk})
+        )
+        return {
+            "status": "success",
+            "result": result,
+            "format": request.output_format
+        }
+    
+    return _ndjson_response(run)
+
 @app.post("/api/analyze-requirements-full")
 async def analyze_requirements_full_endpoint(request: RequirementsRequest):
     """
@@ -142,18 +259,13 @@ async def generate_code_endpoint(request: CodeGenerationRequest):
     """
     try:
         logger.info(f"[API] Generating code for requirements")
-        agent = StandaloneCodeGenerationAgent()
-        await agent.start()
-        
-        try:
-            code = await agent.generate_code(request.requirements)
-            return {
-                "status": "success",
-                "code": code,
-                "length": len(code)
-            }
-        finally:
-            await agent.stop()
+        agent = await _get_pooled("code", StandaloneCodeGenerationAgent)
+        code = await agent.generate_code(request.requirements)
+        return {
+            "status": "success",
+            "code": code,
+            "length": len(code)
+        }
     except Exception as e:
         logger.error(f"[API] Error generating code: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error generating code: {str(e)}")
@@ -172,18 +284,16 @@ async def generate_ui_endpoint(request: UIGenerationRequest):
     """
     try:
         logger.info(f"[API] Generating UI code for requirements")
-        agent = StandaloneUIGenerationAgent()
-        await agent.start()
-        
-        try:
-            ui_code = await agent.generate_ui_code(request.requirements)
-            return {
-                "status": "success",
-                "ui_code": ui_code,
-                "length": len(ui_code)
-            }
-        finally:
-            await agent.stop()
+        agent = await _get_pooled("ui", StandaloneUIGenerationAgent)
+        ui_code = await agent.generate_ui_code(request.requirements)
+        return {
+            "status": "success",
+            "ui_code": ui_code,
+            "length": len(ui_code)
+        }
+    except UIGenerationOverloaded as e:
+        logger.warning(f"[API] UI generation overloaded: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"[API] Error generating UI code: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error generating UI code: {str(e)}")
@@ -202,22 +312,17 @@ async def integrate_project_endpoint(request: IntegrationRequest):
     """
     try:
         logger.info(f"[API] Integrating project")
-        agent = StandaloneIntegratorAgent()
-        await agent.start()
-        
-        try:
-            project_dir = await agent.integrate_project(
-                request.backend_code,
-                request.ui_code,
-                request.requirements or {}
-            )
-            return {
-                "status": "success",
-                "project_dir": project_dir,
-                "exists": os.path.exists(project_dir) if project_dir else False
-            }
-        finally:
-            await agent.stop()
+        agent = await _get_pooled("integrator", StandaloneIntegratorAgent)
+        project_dir = await agent.integrate_project(
+            request.backend_code,
+            request.ui_code,
+            request.requirements or {}
+        )
+        return {
+            "status": "success",
+            "project_dir": project_dir,
+            "exists": os.path.exists(project_dir) if project_dir else False
+        }
     except Exception as e:
         logger.error(f"[API] Error integrating project: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error integrating project: {str(e)}")
@@ -249,6 +354,26 @@ async def deploy_project_endpoint(request: DeploymentRequest):
         logger.error(f"[API] Error deploying project: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error deploying project: {str(e)}")
 
+@app.get("/api/deployment-status")
+async def deployment_status_endpoint(deployment_id: str):
+    """
+    Check on a background deployment started by the full project workflow
+    
+    Args:
+        deployment_id: Deployment id returned by the workflow
+        
+    Returns:
+        The deployment result with backend and frontend URLs once finished (the entry is then
+        dropped), otherwise an in_progress status
+    """
+    task = _deployments.get(deployment_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail=f"No deployment found for {deployment_id}")
+    if not task.done():
+        return {"status": "in_progress", "deployment_id": deployment_id, "message": "Deployment in progress"}
+    del _deployments[deployment_id]
+    return task.result()
+
 # Full Workflow Endpoint (all-in-one)
 @app.post("/api/generate-full-project")
 async def generate_full_project_endpoint(request: RequirementsRequest):
@@ -259,12 +384,70 @@ async def generate_full_project_endpoint(request: RequirementsRequest):
         request: RequirementsRequest with message
         
     Returns:
-        Complete project information including deployment URLs
+        Complete project information; deployment continues in the background (see /api/deployment-status)
+    """
+    return await _run_full_project(request.message)
+
+@app.post("/api/generate-full-project/stream")
+async def generate_full_project_stream_endpoint(request: RequirementsRequest):
+    """
+    Same workflow as /api/generate-full-project, streamed as newline-delimited JSON events
+    
+    Args:
+        request: RequirementsRequest with message
+        
+    Returns:
+        Events {"event": "token", "stage": "backend"|"ui", "attempt": n, "text": chunk} while code
+        is generated, then {"event": "result", "data": ...} or {"event": "error", "detail": ...}
+    """
+    def run(emit):
+        def on_token(stage, chunk, attempt):
+            emit({"event": "token", "stage": stage, "attempt": attempt, "text": chunk})
+        return _run_full_project(request.message, on_token)
+    
+    return _ndjson_response(run)
+
+def _decide_needs_ui(message, text_analysis, json_analysis):
+    """Decide whether the workflow should generate UI code for this request"""
+    # Combine all text sources for UI detection
+    combined_text = message.lower() + " " + text_analysis.lower()
+    if isinstance(json_analysis, dict):
+        combined_text += " " + str(json_analysis).lower()
+    # Chatbot requests always get a UI, so both keyword lists share one regex
+    return _NEEDS_UI_RE.search(combined_text) is not None
+
+async def _deploy_in_background(deployer_agent, project_dir, deployer_start=None):
+    """Deploy a generated project (optional, a failure is reported in the result rather than raised)"""
+    try:
+        if deployer_start is not None:
+            await deployer_start
+        result = await deployer_agent.deploy_project(project_dir)
+        logger.info(f"[API] Step 5 complete: Deployment finished with status {result.get('status')}")
+        return result
+    except Exception as e:
+        logger.error(f"[API] Step 5 failed: {str(e)}")
+        logger.error(traceback.format_exc())
+        # Don't stop deployer agent - keep services running
+        return {
+            "status": "error",
+            "error": str(e),
+            "message": "Project generated but deployment failed"
+        }
+
+async def _run_full_project(message: str, on_token=None):
+    """
+    Run the full project workflow for a user message
+    
+    Args:
+        message: The user's request
+        on_token: Optional callback on_token(stage, chunk, attempt) for streamed backend/UI code
+        
+    Returns:
+        Complete project information; deployment continues in the background (see /api/deployment-status)
     """
-    import traceback
     
     # Truncate very long messages to prevent memory issues
-    message = request.message
+    original_length = len(message)
     max_message_length = 15000  # Increased but still limited
     if len(message) > max_message_length:
         logger.warning(f"[API] Message is very long ({len(message)} chars), truncating to {max_message_length} for processing")
@@ -274,143 +457,144 @@ async def generate_full_project_endpoint(request: RequirementsRequest):
     ui_agent = None
     integrator_agent = None
     deployer_agent = None
+    integrator_start = None
+    deployer_start = None
+    # Tag streamed chunks with the stage that produced them
+    backend_tokens = functools.partial(on_token, "backend") if on_token else None
+    ui_tokens = functools.partial(on_token, "ui") if on_token else None
     
     try:
-        logger.info(f"[API] Starting full project generation workflow (message length: {len(request.message)})")
-        
-        # Step 1: Analyze requirements
-        try:
-            logger.info("[API] Step 1: Analyzing requirements")
-            text_analysis, json_analysis = await analyze_and_format_for_code_generation(message)
-            logger.info(f"[API] Step 1 complete: Analysis length - {len(text_analysis)} chars")
-        except Exception as e:
-            logger.error(f"[API] Step 1 failed: {str(e)}")
-            logger.error(traceback.format_exc())
-            raise HTTPException(status_code=500, detail=f"Error analyzing requirements: {str(e)}")
-        
-        # Step 2: Generate backend code
-        try:
-            logger.info("[API] Step 2: Generating backend code")
-            code_agent = StandaloneCodeGenerationAgent()
-            await code_agent.start()
-            requirements_input = json_analysis if isinstance(json_analysis, dict) else message
-            backend_code = await code_agent.generate_code(requirements_input)
-            logger.info(f"[API] Step 2 complete: Backend code length - {len(backend_code)} chars")
-        except Exception as e:
-            logger.error(f"[API] Step 2 failed: {str(e)}")
-            logger.error(traceback.format_exc())
-            if code_agent:
-                try:
-                    await code_agent.stop()
-                except:
-                    pass
-            raise HTTPException(status_code=500, detail=f"Error generating backend code: {str(e)}")
-        finally:
-            if code_agent:
-                try:
-                    await code_agent.stop()
-                except:
-                    pass
+        logger.info(f"[API] Starting full project generation workflow (message length: {original_length})")
         
-        # Step 3: Check if UI is needed and generate
-        ui_code = None
-        needs_ui = False
-        try:
-            # Combine all text sources for UI detection
-            combined_text = message.lower() + " " + text_analysis.lower()
-            if isinstance(json_analysis, dict):
-                combined_text += " " + str(json_analysis).lower()
-            
-            # Check for UI keywords - always generate UI for chatbot requests
-            ui_keywords = ["ui", "interface", "frontend", "react", "vue", "angular", "web page", "website", 
-                         "chatbot", "chat", "conversational", "user interface", "dashboard", "bot", 
-                         "create", "build", "generate", "make"]
-            
-            # For chatbot creation, always generate UI
-            chatbot_keywords = ["chatbot", "chat bot", "conversational", "bot", "assistant"]
-            is_chatbot_request = any(keyword in combined_text for keyword in chatbot_keywords)
+        # Reuse an earlier run for the same (or a semantically similar) request
+        cached = await get_project(message)
+        if cached and cached.get("project_dir") and os.path.isdir(cached["project_dir"]):
+            logger.info(f"[API] Project cache hit - reusing {cached['project_dir']}")
+            text_analysis = cached["text_analysis"]
+            json_analysis = cached["json_analysis"]
+            backend_code = cached["backend_code"]
+            ui_code = cached["ui_code"]
+            project_dir = cached["project_dir"]
+        else:
+            # The integrator and deployer aren't needed until after generation, so start them in the background
+            deployer_agent = StandaloneDeployerAgent()
+            integrator_start = asyncio.create_task(_get_pooled("integrator", StandaloneIntegratorAgent))
+            deployer_start = asyncio.create_task(deployer_agent.start())
+            code_agent = await _get_pooled("code", StandaloneCodeGenerationAgent)
             
-            if is_chatbot_request:
-                needs_ui = True
-                logger.info("[API] Chatbot detected - UI generation will be enabled")
-            else:
-                needs_ui = any(keyword in combined_text for keyword in ui_keywords)
+            # Step 1: Analyze requirements
+            try:
+                logger.info("[API] Step 1: Analyzing requirements")
+                text_analysis, json_analysis = await analyze_and_format_for_code_generation(message)
+                logger.info(f"[API] Step 1 complete: Analysis length - {len(text_analysis)} chars")
+            except Exception as e:
+                logger.error(f"[API] Step 1 failed: {str(e)}")
+                logger.error(traceback.format_exc())
+                raise HTTPException(status_code=500, detail=f"Error analyzing requirements: {str(e)}")
+        
+            # Fused mode: one LLM call produces both the backend and the UI code
+            needs_ui = None
+            fused = None
+            if MOB_FUSED:
+                needs_ui = _decide_needs_ui(message, text_analysis, json_analysis)
+                if needs_ui:
+                    logger.info("[API] Steps 2-3: Generating backend and UI code in one fused call")
+                    fused_agent = await _get_pooled("fused", StandaloneFusedGenerationAgent)
+                    fused = await fused_agent.generate(json_analysis if isinstance(json_analysis, dict) and json_analysis else message)
+                    if fused is None:
+                        logger.warning("[API] Fused generation failed - falling back to separate code and UI agents")
             
-            if needs_ui:
-                logger.info("[API] Step 3: Generating UI code")
-                ui_agent = StandaloneUIGenerationAgent()
-                await ui_agent.start()
-                requirements_input = json_analysis if isinstance(json_analysis, dict) else message
-                ui_code = await ui_agent.generate_ui_code(requirements_input)
-                logger.info(f"[API] Step 3 complete: UI code length - {len(ui_code)} chars")
+            if fused is not None:
+                backend_code = fused["backend_code"]
+                ui_code = fused["ui_code"]
+                logger.info(f"[API] Steps 2-3 complete: Backend {len(backend_code)} chars, UI {len(ui_code)} chars")
             else:
-                logger.info("[API] Step 3: Skipping UI generation (not needed)")
-        except Exception as e:
-            logger.error(f"[API] Step 3 failed: {str(e)}")
-            logger.error(traceback.format_exc())
-            if ui_agent:
+                # Step 2: Generate backend code
                 try:
-                    await ui_agent.stop()
-                except:
-                    pass
-            # Don't fail the whole workflow if UI generation fails
-            logger.warning("[API] Continuing without UI code")
-            ui_code = None
-        finally:
-            if ui_agent:
-                try:
-                    await ui_agent.stop()
-                except:
-                    pass
+                    logger.info("[API] Step 2: Generating backend code")
+                    requirements_input = json_analysis if isinstance(json_analysis, dict) and json_analysis else message
+                    backend_code = await code_agent.generate_code(requirements_input, on_token=backend_tokens)
+                    logger.info(f"[API] Step 2 complete: Backend code length - {len(backend_code)} chars")
+                except Exception as e:
+                    logger.error(f"[API] Step 2 failed: {str(e)}")
+                    logger.error(traceback.format_exc())
+                    raise HTTPException(status_code=500, detail=f"Error generating backend code: {str(e)}")
         
-        # Step 4: Integrate project
-        try:
-            logger.info("[API] Step 4: Integrating project")
-            integrator_agent = StandaloneIntegratorAgent()
-            await integrator_agent.start()
-            project_dir = await integrator_agent.integrate_project(
-                backend_code,
-                ui_code or "",
-                json_analysis if isinstance(json_analysis, dict) else {}
-            )
-            logger.info(f"[API] Step 4 complete: Project directory - {project_dir}")
-        except Exception as e:
-            logger.error(f"[API] Step 4 failed: {str(e)}")
-            logger.error(traceback.format_exc())
-            if integrator_agent:
+                # Step 3: Check if UI is needed and generate
+                ui_code = None
                 try:
-                    await integrator_agent.stop()
-                except:
-                    pass
-            raise HTTPException(status_code=500, detail=f"Error integrating project: {str(e)}")
-        finally:
-            if integrator_agent:
-                try:
-                    await integrator_agent.stop()
-                except:
-                    pass
+                    if needs_ui is None:
+                        needs_ui = _decide_needs_ui(message, text_analysis, json_analysis)
+            
+                    if needs_ui:
+                        logger.info("[API] Step 3: Generating UI code")
+                        ui_agent = await _get_pooled("ui", StandaloneUIGenerationAgent)
+                        requirements_input = json_analysis if isinstance(json_analysis, dict) and json_analysis else message
+                        ui_code = await ui_agent.generate_ui_code(requirements_input, on_token=ui_tokens)
+                        logger.info(f"[API] Step 3 complete: UI code length - {len(ui_code)} chars")
+                    else:
+                        logger.info("[API] Step 3: Skipping UI generation (not needed)")
+                except Exception as e:
+                    logger.error(f"[API] Step 3 failed: {str(e)}")
+                    logger.error(traceback.format_exc())
+                    # Don't fail the whole workflow if UI generation fails
+                    logger.warning("[API] Continuing without UI code")
+                    ui_code = None
         
-        # Step 5: Deploy project (optional, don't fail if deployment fails)
-        deployment_result = {}
-        try:
-            logger.info("[API] Step 5: Deploying project")
+            # Step 4: Integrate project
+            try:
+                logger.info("[API] Step 4: Integrating project")
+                integration_requirements = json_analysis if isinstance(json_analysis, dict) else {}
+                # Byte-identical code and requirements integrate to the same tree, so copy a cached one
+                dir_key = project_dir_key(backend_code, ui_code, integration_requirements)
+                project_dir = await restore_project_dir(
+                    dir_key, os.path.join(os.getcwd(), f"generated_project_{uuid.uuid4().hex[:8]}")
+                )
+                if project_dir:
+                    logger.info(f"[API] Step 4 complete: Reused cached project tree - {project_dir}")
+                else:
+                    integrator_agent = await integrator_start
+                    project_dir = await integrator_agent.integrate_project(
+                        backend_code,
+                        ui_code or "",
+                        integration_requirements
+                    )
+                    if project_dir:
+                        await store_project_dir(dir_key, project_dir)
+                    logger.info(f"[API] Step 4 complete: Project directory - {project_dir}")
+            except Exception as e:
+                logger.error(f"[API] Step 4 failed: {str(e)}")
+                logger.error(traceback.format_exc())
+                raise HTTPException(status_code=500, detail=f"Error integrating project: {str(e)}")
+            
+            # Remember this run so similar requests can skip the pipeline (failed generations are not cached)
+            if not backend_code.startswith("Failed to generate") and not (ui_code or "").startswith("Failed to generate"):
+                await put_project(message, {
+                    "text_analysis": text_analysis,
+                    "json_analysis": json_analysis,
+                    "backend_code": backend_code,
+                    "ui_code": ui_code,
+                    "project_dir": project_dir
+                })
+        
+        # Step 5: Deploy project in the background - installing and booting the services can take
+        # minutes, so return now and let the client poll /api/deployment-status for the URLs
+        logger.info("[API] Step 5: Deploying project in the background")
+        if deployer_agent is None:
             deployer_agent = StandaloneDeployerAgent()
-            await deployer_agent.start()
-            deployment_result = await deployer_agent.deploy_project(project_dir)
-            logger.info(f"[API] Step 5 complete: Deployment successful")
-        except Exception as e:
-            logger.error(f"[API] Step 5 failed: {str(e)}")
-            logger.error(traceback.format_exc())
-            # Don't fail the whole workflow if deployment fails
-            deployment_result = {
-                "status": "error",
-                "error": str(e),
-                "message": "Project generated but deployment failed"
-            }
-            logger.warning("[API] Continuing despite deployment failure")
-        finally:
-            # Don't stop deployer agent - keep services running
-            pass
+            deployer_start = asyncio.create_task(deployer_agent.start())
+        _prune_deployments()
+        deployment_id = uuid.uuid4().hex
+        _deployments[deployment_id] = asyncio.create_task(
+            _deploy_in_background(deployer_agent, project_dir, deployer_start)
+        )
+        deployer_start = None  # Owned by the deployment task now
+        deployment_result = {
+            "status": "in_progress",
+            "deployment_id": deployment_id,
+            "project_dir": project_dir,
+            "message": "Deployment in progress"
+        }
         
         return {
             "status": "success",
@@ -437,8 +621,12 @@ async def generate_full_project_endpoint(request: RequirementsRequest):
         logger.error(f"[API] Unexpected error in full project generation: {str(e)}")
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error generating full project: {str(e)}")
+    finally:
+        # Don't leave an agent startup running if an earlier step failed
+        for task in (integrator_start, deployer_start):
+            if task is not None and not task.done():
+                task.cancel()
 
 if __name__ == "__main__":
     import uvicorn
-    port = int(os.getenv("API_PORT", "8000"))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    uvicorn.run(app, host="0.0.0.0", port=API_PORT)
@@ -0,0 +1,235 @@
+"""
+Persistent caches for the full project generation pipeline
+- Project cache: a resubmitted (or reworded) request reuses an earlier run's analysis and generated code
+- Project directory cache: identical generated code reuses an already integrated project tree
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+from typing import Any, Dict, Optional
+
+import orjson
+
+from .config import OLLAMA_MODEL
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Semantic matching (similar prompts hit the same entry)
+try:
+    from gptcache import Cache as GPTCache, Config as GPTCacheConfig
+    from gptcache.adapter.api import init_similar_cache, get as gptcache_get, put as gptcache_put
+    from gptcache.embedding import SBERT
+    GPTCACHE_AVAILABLE = True
+except ImportError:
+    GPTCACHE_AVAILABLE = False
+    logger.warning("gptcache not available. Project cache will only match identical requests.")
+
+# Exact-match fallback when gptcache or its embedding model is unavailable
+try:
+    from diskcache import Cache as DiskCache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+PROJECT_CACHE_DIR = os.path.expanduser(os.getenv("PROJECT_CACHE_DIR", "~/.mob_cache/projects"))
+PROJECT_CACHE_SIZE_LIMIT = 1 << 30  # 1GB
+# Sentence embedding model used to compare requests
+PROJECT_CACHE_EMBEDDING = os.getenv("PROJECT_CACHE_EMBEDDING", "all-MiniLM-L6-v2")
+# High enough that changed names or numbers in a request don't produce a false hit
+PROJECT_CACHE_THRESHOLD = float(os.getenv("PROJECT_CACHE_THRESHOLD", "0.92"))
+PROJECT_CACHE_ENABLED = os.getenv("PROJECT_CACHE_ENABLED", "true").lower() == "true"
+
+_semantic_cache = None
+_exact_cache = None
+_init_lock = asyncio.Lock()
+
+
+def _normalize(message: str) -> str:
+    """Collapse whitespace and case so trivially different requests share an entry"""
+    return " ".join(message.lower().split())
+
+
+def _exact_key(message: str) -> str:
+    return hashlib.sha256(f"{OLLAMA_MODEL}|{_normalize(message)}".encode("utf-8")).hexdigest()
+
+
+def _open_caches():
+    """Open the semantic cache (or the exact-match fallback); loads the embedding model"""
+    global _semantic_cache, _exact_cache
+    if GPTCACHE_AVAILABLE:
+        try:
+            cache_obj = GPTCache()
+            init_similar_cache(
+                data_dir=os.path.join(PROJECT_CACHE_DIR, "semantic"),
+                cache_obj=cache_obj,
+                embedding=SBERT(PROJECT_CACHE_EMBEDDING),
+                config=GPTCacheConfig(similarity_threshold=PROJECT_CACHE_THRESHOLD),
+            )
+            _semantic_cache = cache_obj
+            return
+        except Exception as e:
+            logger.warning(f"Could not initialize semantic project cache: {str(e)}")
+    if DISKCACHE_AVAILABLE:
+        try:
+            _exact_cache = DiskCache(os.path.join(PROJECT_CACHE_DIR, "exact"), size_limit=PROJECT_CACHE_SIZE_LIMIT)
+        except Exception as e:
+            logger.warning(f"Could not open project cache at {PROJECT_CACHE_DIR}: {str(e)}")
+
+
+async def _ensure_open() -> bool:
+    """Open the cache on first use; returns False when no backend is usable"""
+    if not PROJECT_CACHE_ENABLED:
+        return False
+    if _semantic_cache is None and _exact_cache is None:
+        async with _init_lock:
+            if _semantic_cache is None and _exact_cache is None:
+                await asyncio.to_thread(_open_caches)
+    return _semantic_cache is not None or _exact_cache is not None
+
+
+def _get_sync(message: str) -> Optional[bytes]:
+    if _semantic_cache is not None:
+        # Scope entries to the model so switching models doesn't serve stale code
+        return gptcache_get(f"[{OLLAMA_MODEL}] {_normalize(message)}", cache_obj=_semantic_cache)
+    return _exact_cache.get(_exact_key(message))
+
+
+def _put_sync(message: str, data: str):
+    if _semantic_cache is not None:
+        gptcache_put(f"[{OLLAMA_MODEL}] {_normalize(message)}", data, cache_obj=_semantic_cache)
+    else:
+        _exact_cache.set(_exact_key(message), data)
+
+
+async def get_project(message: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up a previous pipeline result for this (or a semantically similar) request
+
+    Args:
+        message: The user's request as sent to the full project workflow
+
+    Returns:
+        Dict with text_analysis, json_analysis, backend_code, ui_code and project_dir, or None
+    """
+    if not await _ensure_open():
+        return None
+    try:
+        data = await asyncio.to_thread(_get_sync, message)
+    except Exception as e:
+        logger.warning(f"Project cache lookup failed: {str(e)}")
+        return None
+    if not data:
+        return None
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return None
+
+
+async def put_project(message: str, result: Dict[str, Any]):
+    """
+    Store a successful pipeline result for later requests
+
+    Args:
+        message: The user's request as sent to the full project workflow
+        result: Dict with text_analysis, json_analysis, backend_code, ui_code and project_dir
+    """
+    if not await _ensure_open():
+        return
+    try:
+        await asyncio.to_thread(_put_sync, message, orjson.dumps(result).decode("utf-8"))
+    except Exception as e:
+        logger.warning(f"Project cache store failed: {str(e)}")
+
+
+# Project directory cache: integrated project trees keyed on the exact code and requirements they were built from
+PROJECT_DIR_CACHE = os.path.expanduser(os.getenv("PROJECT_DIR_CACHE", "~/.mob/projects"))
+# Cached trees are stored path-agnostic: the project's absolute path (e.g. in the README's
+# "cd ..." instructions) is swapped for this placeholder and filled back in on restore
+_PROJECT_DIR_PLACEHOLDER = b"{{MOB_PROJECT_DIR}}"
+# Larger files are never rewritten (the integrator only writes small text files)
+_PATH_REWRITE_MAX_BYTES = 1 << 20
+
+
+def project_dir_key(backend_code: str, ui_code: Optional[str], requirements: Dict[str, Any]) -> str:
+    """Hash the integrator's inputs; byte-identical inputs produce the same project tree"""
+    payload = b"|".join((
+        b"v2",  # Trees cached before paths were made relative are not reused
+        backend_code.encode("utf-8"),
+        (ui_code or "").encode("utf-8"),
+        orjson.dumps(requirements, option=orjson.OPT_SORT_KEYS, default=str),
+    ))
+    return hashlib.blake2b(payload).hexdigest()[:16]
+
+
+def _replace_in_tree(root: str, old: bytes, new: bytes):
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if os.path.islink(path) or os.path.getsize(path) > _PATH_REWRITE_MAX_BYTES:
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+            if old in data:
+                with open(path, "wb") as f:
+                    f.write(data.replace(old, new))
+
+
+def _restore_sync(key: str, dest: str) -> Optional[str]:
+    cached = os.path.join(PROJECT_DIR_CACHE, key)
+    if not os.path.isdir(cached):
+        return None
+    shutil.copytree(cached, dest, symlinks=True)
+    _replace_in_tree(dest, _PROJECT_DIR_PLACEHOLDER, os.fsencode(dest))
+    return dest
+
+
+def _store_sync(key: str, project_dir: str):
+    cached = os.path.join(PROJECT_DIR_CACHE, key)
+    if os.path.isdir(cached):
+        return
+    os.makedirs(PROJECT_DIR_CACHE, exist_ok=True)
+    # Copy beside the final path and rename so a half-written tree is never served
+    tmp_path = f"{cached}.tmp-{os.getpid()}"
+    shutil.copytree(project_dir, tmp_path, symlinks=True)
+    try:
+        _replace_in_tree(tmp_path, os.fsencode(project_dir), _PROJECT_DIR_PLACEHOLDER)
+        os.replace(tmp_path, cached)
+    except OSError:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+
+async def restore_project_dir(key: str, dest: str) -> Optional[str]:
+    """
+    Copy a cached project tree to a new project directory
+
+    Args:
+        key: Key from project_dir_key()
+        dest: Project directory to create
+
+    Returns:
+        dest on a hit, or None when no tree is cached for key
+    """
+    try:
+        return await asyncio.to_thread(_restore_sync, key, dest)
+    except Exception as e:
+        logger.warning(f"Project directory cache restore failed: {str(e)}")
+        return None
+
+
+async def store_project_dir(key: str, project_dir: str):
+    """
+    Cache an integrated project tree for later requests with identical inputs
+
+    Args:
+        key: Key from project_dir_key()
+        project_dir: Project directory produced by the integrator
+    """
+    try:
+        await asyncio.to_thread(_store_sync, key, project_dir)
+    except Exception as e:
+        logger.warning(f"Project directory cache store failed: {str(e)}")
@@ -0,0 +1,29 @@
+"""
+Central configuration for Mother of Bots
+Loads the .env file once and exposes settings as module-level constants
+"""
+import os
+from dotenv import load_dotenv
+
+# Load environment variables (the only place .env is read)
+load_dotenv()
+
+# Ollama configuration
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "deepseek-r1:latest")
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")  # Keep the model loaded between requests
+
+# Generate backend and UI code in one fused LLM call (falls back to separate agents on failure)
+MOB_FUSED = os.getenv("MOB_FUSED", "0").lower() in ("1", "true")
+
+# FastAPI configuration
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+
+# Port used by deployed backends (kept separate from the main API server)
+DEPLOYED_BACKEND_PORT = os.getenv("DEPLOYED_BACKEND_PORT", "8001")
+
+# XMPP configuration for the multi-agent system
+XMPP_SERVER = os.getenv("XMPP_SERVER", "localhost")
+XMPP_PORT = int(os.getenv("XMPP_PORT", "5222"))
+XMPP_USE_TLS = os.getenv("XMPP_USE_TLS", "False").lower() == "true"
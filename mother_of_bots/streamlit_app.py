@@ -3,20 +3,22 @@ import asyncio
 import time
 import logging
 import os
+import re
+import string
 import uuid
 import nest_asyncio
 import httpx
+import orjson
 import gc
-from dotenv import load_dotenv
+import hashlib
+import threading
+import weakref
 from io import BytesIO
 from typing import Optional, Dict, List
 
 # Apply nest_asyncio to allow nested event loops
 nest_asyncio.apply()
 
-# Load environment variables
-load_dotenv()
-
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -49,12 +51,77 @@ except ImportError:
 # Note: .doc files are processed using LibreOffice (system dependency)
 # pypandoc is not used as it doesn't support .doc format directly
 
-# Configuration from environment variables
-OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "deepseek-r1:latest")
-OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+# UI-related words in requirements keys, values or text (see _check_if_ui_needed)
+_UI_RE = re.compile(
+    r"\b(ui|interface|frontend|react|vue|angular|web\s*page|website|responsive|user\s*interface|"
+    r"dashboard|display|visualization|ui_components|design|design_preferences)\b",
+    re.I
+)
+
+# Short greetings and follow-ups that never need requirements analysis or code generation
+_CHIT_CHAT_RE = re.compile(r"^(hi|hello|hey|thanks|thank you|ok|okay|cool|what|who|why)\b", re.I)
+CHIT_CHAT_MAX_LENGTH = 40
+
+# Phrases in the user's message that explicitly ask for code generation
+CODE_KEYWORDS = frozenset({
+    "generate code", "create code", "write code", "code for", "generate a program",
+    "build an application", "develop a system", "create an app", "write a program",
+    "script for", "implement a solution", "code that can", "build a website",
+    "create a function", "make an algorithm"
+})
+# One alternation so the message is scanned once for all phrases
+_CODE_KEYWORDS_RE = re.compile("|".join(re.escape(keyword) for keyword in sorted(CODE_KEYWORDS)))
+
+# Words in a requirements analysis that suggest a code-related request
+CODE_INDICATORS = frozenset({
+    "code", "program", "application", "function", "module", "class",
+    "api", "endpoint", "system", "backend", "frontend", "algorithm",
+    "software", "app", "website", "interface", "database"
+})
+# Analysis tokens are matched whole, so plural and common inflected forms map back to their
+# indicator; each indicator still counts once however many of its forms appear
+CODE_INDICATOR_FORMS = {
+    form: indicator
+    for indicator in CODE_INDICATORS
+    for form in (indicator, indicator + "s", indicator + "es")
+}
+CODE_INDICATOR_FORMS.update({
+    "coding": "code", "coded": "code", "programming": "program", "programmed": "program",
+    "functionality": "function", "functionalities": "function", "functional": "function",
+    "systematic": "system", "algorithmic": "algorithm", "modular": "module",
+})
+# Technologies that, alongside a functionalities section, mark a code request
+TECH_TOKENS = frozenset({"python", "javascript", "java", "api", "apis", "database", "databases"})
+_WORD_RE = re.compile(r"[a-z]+")
+
+# Markdown appended to generated-project responses
+_PROJECT_INFO_TMPL = string.Template("""
+## Project Integration
+A complete project has been assembled at: `$dir`
+
+- Backend code is in the `backend/` directory
+- Frontend code is in the `frontend/` directory
+- A README.md with setup instructions is included
+$deployment
+""")
+
+_DEPLOYMENT_INFO_TMPL = string.Template("""
+## Deployment
+Your application has been deployed and is running at:
+
+- Backend API: [$backend_url]($backend_url)
+- Frontend UI: [$frontend_url]($frontend_url)
+
+The services will remain running until you close this application or click "Stop Services" in the sidebar.
+""")
+
+_DEPLOYMENT_PENDING_INFO = """
+## Deployment
+Deployment in progress… The backend and frontend URLs will appear in the sidebar once the services are running.
+"""
 
-# FastAPI configuration
-API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
+# Configuration (loaded once from .env in config.py)
+from config import OLLAMA_MODEL, OLLAMA_URL, OLLAMA_KEEP_ALIVE, API_BASE_URL
 
 # Setup page config
 st.set_page_config(
@@ -64,134 +131,72 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-# Add custom CSS for better look and feel
-st.markdown("""
-<style>
-.chat-message {
-    padding: 1.5rem; 
-    border-radius: 0.5rem; 
-    margin-bottom: 1rem; 
-    display: flex;
-    flex-direction: column;
-}
-.chat-message.user {
-    background-color: #1E88E5; /* Bright Blue */
-    color: #FFFFFF;
-}
-.chat-message.assistant {
-    background-color: #43A047; /* Vibrant Green */
-    color: #FFFFFF;
-}
-.chat-message.system {
-    background-color: #F4511E; /* Deep Orange */
-    color: #FFFFFF;
-    font-size: 0.85em;
-    opacity: 0.95;
-}
-.chat-message .avatar {
-    width: 20%;
-}
-.chat-message .avatar img {
-    max-width: 78px;
-    max-height: 78px;
-    border-radius: 50%;
-    object-fit: cover;
-    border: 3px solid #FFFFFF;
-}
-.chat-message .message {
-    width: 100%;
-    padding: 0 1.5rem;
-}
-h1 {
-    color: #FFD600; /* Vivid Yellow */
-    text-shadow: 1px 1px 3px rgba(0,0,0,0.5);
-}
-/* Requirements analysis styling */
-.requirements-analysis h3 {
-    color: #00E676; /* Neon Green */
-    margin-top: 0.8rem;
-    margin-bottom: 0.3rem;
-    font-size: 1.1rem;
-}
-.requirements-analysis ul {
-    margin-top: 0.2rem;
-}
-/* Code generation styling */
-.code-generation-output {
-    margin-top: 1rem;
-    border-left: 4px solid #00E5FF; /* Electric Blue */
-    padding-left: 1rem;
-}
-.code-generation-output h2 {
-    color: #00E5FF;
-    font-size: 1.2rem;
-    margin-top: 1rem;
-    margin-bottom: 0.5rem;
-}
-/* Custom styling for different code types */
-.code-generation-output h2:contains("Backend") {
-    color: #FF3D00; /* Fiery Red */
-}
-.code-generation-output h2:contains("UI") {
-    color: #FFD600; /* Vivid Yellow */
-}
-.code-generation-output pre {
-    background-color: #263238; /* Charcoal */
-    color: #FFFFFF;
-    padding: 1rem;
-    border-radius: 8px;
-    overflow-x: auto;
-}
-/* Different syntax highlighting styles based on code type */
-.language-python {
-    border-left: 4px solid #4CAF50; /* Fresh Green */
-}
-.language-jsx, .language-javascript, .language-tsx {
-    border-left: 4px solid #FFAB00; /* Amber */
-}
-.chat-input-container {
-    display: flex;
-    align-items: center;
-    background-color: #212121;
-    padding: 1rem;
-    border-radius: 0.5rem;
-}
-.chat-input {
-    flex: 1;
-    background: #424242;
-    color: #FFFFFF;
-    border: none;
-    padding: 0.75rem 1rem;
-    border-radius: 0.3rem;
-}
-.action-buttons {
-    display: flex;
-    gap: 0.5rem;
-    margin-top: 0.5rem;
-}
-.action-buttons button {
-    background: #00E5FF;
-    color: #000000;
-    border: none;
-    padding: 0.5rem 1rem;
-    border-radius: 0.3rem;
-    font-weight: bold;
-    cursor: pointer;
-    transition: background 0.3s ease;
-}
-.action-buttons button:hover {
-    background: #00B8D4;
-}
-</style>
+# Stylesheet for the chat interface, kept as a static asset
+CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "app.css")
+
+@st.cache_resource
+def _load_css():
+    """Read the stylesheet once per process and wrap it for st.markdown"""
+    with open(CSS_PATH, encoding="utf-8") as f:
+        return f"<style>\n{f.read()}</style>"
+
+# Add custom CSS for better look and feel (Streamlit drops elements not re-emitted on a rerun)
+st.markdown(_load_css(), unsafe_allow_html=True)
+
+def _load_ollama_model():
+    """Ask Ollama to load the model; an empty prompt loads it without generating anything"""
+    import requests
+    try:
+        requests.post(
+            f"{OLLAMA_URL}/api/generate",
+            json={"model": OLLAMA_MODEL, "prompt": "", "stream": False, "keep_alive": OLLAMA_KEEP_ALIVE},
+            timeout=120
+        )
+        logger.info(f"Ollama model {OLLAMA_MODEL} pre-loaded")
+    except Exception as e:
+        logger.warning(f"Ollama warmup failed: {str(e)}")
+
+@st.cache_resource
+def _warm_up_ollama():
+    """Load the model in the background once per process so the page renders immediately"""
+    threading.Thread(target=_load_ollama_model, daemon=True, name="ollama-warmup").start()
+    return True
+
+_warm_up_ollama()
+
+def _close_session_io(loop, http):
+    """Close a finished session's HTTP client and event loop"""
+    if loop.is_closed() or loop.is_running():
+        return
+    try:
+        loop.run_until_complete(http.aclose())
+    except Exception as e:
+        logger.warning(f"Could not close session HTTP client: {str(e)}")
+    finally:
+        loop.close()
 
-""", unsafe_allow_html=True)
+class _SessionIO:
+    """Per-session event loop and HTTP client, closed once Streamlit drops the session's state"""
+    
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        # One HTTP client (bound to the loop above) so API calls and status probes reuse keep-alive connections
+        self.http = httpx.AsyncClient(
+            timeout=600.0,  # Increased timeout to 10 minutes
+            limits=httpx.Limits(max_keepalive_connections=4)
+        )
+        # Streamlit has no session-end hook; the finalizer runs when the session state is garbage
+        # collected (or at interpreter exit) and must not reference self
+        weakref.finalize(self, _close_session_io, self.loop, self.http)
 
 # Initialize session state variables
 if 'agent' not in st.session_state:
     st.session_state.agent = None
     st.session_state.agent_running = False
     st.session_state.messages = []
-    st.session_state.user_id = f"user_{uuid.uuid4()}"
+    st.session_state.archived_count = 0  # Messages spooled to the on-disk archive, see append_message
+    st.session_state.archive_offset = 0  # How many archived messages are paged back in above the chat
+    st.session_state.user_id = f"user_{uuid.uuid4().hex}"
     st.session_state.waiting_for_response = False
     
     # Using FastAPI mode (no agent_type needed)
@@ -203,7 +208,15 @@ if 'agent' not in st.session_state:
     st.session_state.deployer_agent = None  # Store deployer agent for stopping services
     st.session_state.backend_url = None  # Backend URL for deployed services
     st.session_state.frontend_url = None  # Frontend URL for deployed services
+    st.session_state.pending_deployment = None  # Deployment id of a deployment still running on the API
     st.session_state.uploaded_documents = []  # Store uploaded documents
+    st.session_state.analysis_cache = {}  # Message hash -> requirements analysis, see get_requirements_analysis
+    # One event loop reused for every async call in this session. It stays per session and runs on the
+    # script thread: the coroutines draw Streamlit elements and read session state, which a loop shared
+    # across sessions on a background thread could not do
+    st.session_state.session_io = _SessionIO()
+    st.session_state.loop = st.session_state.session_io.loop
+    st.session_state.http = st.session_state.session_io.http
 
 # Document processing functions
 def extract_text_from_pdf(file_bytes: bytes) -> str:
@@ -466,15 +479,8 @@ def process_uploaded_file(uploaded_file) -> Optional[Dict]:
 
 # Create a simple synchronous wrapper for async functions
 def run_async(coro):
-    try:
-        return asyncio.run(coro)
-    except RuntimeError as e:
-        if "This event loop is already running" in str(e):
-            # If the event loop is already running, use the current one
-            loop = asyncio.get_event_loop()
-            return loop.run_until_complete(coro)
-        else:
-            raise
+    """Run a coroutine on the session's persistent event loop (nest_asyncio makes this re-entrant)"""
+    return st.session_state.loop.run_until_complete(coro)
 
 def initialize_agent():
     """No longer needed - using FastAPI instead"""
@@ -498,50 +504,143 @@ def end_agent_session():
         return False
     return True
 
-async def call_fastapi_endpoint(endpoint: str, payload: dict):
-    """Call a FastAPI endpoint asynchronously with memory-efficient handling"""
-    # Limit payload size to prevent memory issues
+def _limit_payload(payload: dict):
+    """Limit payload size to prevent memory issues"""
     if "message" in payload:
         max_message_length = 15000  # Limit total message length
         if len(payload["message"]) > max_message_length:
             logger.warning(f"Message too long ({len(payload['message'])} chars), truncating to {max_message_length}")
             payload["message"] = payload["message"][:max_message_length] + "\n\n[Message truncated due to size limits]"
+
+async def call_fastapi_endpoint(endpoint: str, payload: dict):
+    """Call a FastAPI endpoint asynchronously with memory-efficient handling"""
+    _limit_payload(payload)
     
-    async with httpx.AsyncClient(timeout=600.0) as client:  # Increased timeout to 10 minutes
+    try:
+        response = await st.session_state.http.post(
+            f"{API_BASE_URL}{endpoint}",
+            content=orjson.dumps(payload),
+            headers={"Content-Type": "application/json"}
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)
+    except httpx.HTTPStatusError as e:
+        # Try to get error details from response
+        error_detail = "Unknown error"
         try:
-            response = await client.post(f"{API_BASE_URL}{endpoint}", json=payload)
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            # Try to get error details from response
-            error_detail = "Unknown error"
-            try:
-                error_response = e.response.json()
-                error_detail = error_response.get("detail", str(e))
-                logger.error(f"API returned error: {error_detail}")
-            except:
-                error_detail = f"HTTP {e.response.status_code}: {e.response.text[:500]}"
-                logger.error(f"API error (non-JSON): {error_detail}")
-            raise Exception(f"API Error: {error_detail}")
-        except httpx.HTTPError as e:
-            logger.error(f"HTTP error calling {endpoint}: {str(e)}")
-            raise Exception(f"Connection error: {str(e)}")
-        except Exception as e:
-            logger.error(f"Error calling {endpoint}: {str(e)}")
-            raise
+            error_response = e.response.json()
+            error_detail = error_response.get("detail", str(e))
+            logger.error(f"API returned error: {error_detail}")
+        except:
+            error_detail = f"HTTP {e.response.status_code}: {e.response.text[:500]}"
+            logger.error(f"API error (non-JSON): {error_detail}")
+        raise Exception(f"API Error: {error_detail}")
+    except httpx.HTTPError as e:
+        logger.error(f"HTTP error calling {endpoint}: {str(e)}")
+        raise Exception(f"Connection error: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error calling {endpoint}: {str(e)}")
+        raise
+
+async def stream_fastapi_endpoint(endpoint: str, payload: dict):
+    """Call a streaming FastAPI endpoint and yield its newline-delimited JSON events"""
+    _limit_payload(payload)
+    
+    try:
+        async with st.session_state.http.stream(
+            "POST",
+            f"{API_BASE_URL}{endpoint}",
+            content=orjson.dumps(payload),
+            headers={"Content-Type": "application/json"}
+        ) as response:
+            if response.status_code != 200:
+                body = await response.aread()
+                raise Exception(f"API Error: HTTP {response.status_code}: {body[:500].decode('utf-8', 'replace')}")
+            async for line in response.aiter_lines():
+                if line:
+                    yield orjson.loads(line)
+    except httpx.HTTPError as e:
+        logger.error(f"HTTP error calling {endpoint}: {str(e)}")
+        raise Exception(f"Connection error: {str(e)}")
+
+# Requirements analyses kept per session; code-request detection and the analysis display share one call
+ANALYSIS_CACHE_SIZE = 128
+# The analyzer reports failures as text; these are never cached so the next attempt retries
+_ANALYSIS_ERROR_PREFIXES = ("Failed to analyze requirements", "Error analyzing requirements")
+
+def _analysis_cache_key(message):
+    return hashlib.blake2b(message.encode("utf-8"), digest_size=16).hexdigest()
+
+def _cached_analysis(message):
+    """Return this session's earlier analysis of message, or None"""
+    return st.session_state.setdefault("analysis_cache", {}).get(_analysis_cache_key(message))
+
+def _remember_analysis(message, analysis):
+    """Cache a successful analysis of message for this session"""
+    if not analysis or analysis.startswith(_ANALYSIS_ERROR_PREFIXES):
+        return
+    analysis_cache = st.session_state.setdefault("analysis_cache", {})
+    # Dicts keep insertion order, so the first key is the oldest entry
+    if len(analysis_cache) >= ANALYSIS_CACHE_SIZE:
+        del analysis_cache[next(iter(analysis_cache))]
+    analysis_cache[_analysis_cache_key(message)] = analysis
 
 async def get_requirements_analysis(message):
-    """Get requirements analysis via FastAPI"""
+    """Get requirements analysis via FastAPI (memoized per session by message hash)"""
+    analysis = _cached_analysis(message)
+    if analysis is not None:
+        logger.info("Reusing cached requirements analysis")
+        return analysis
     try:
         result = await call_fastapi_endpoint("/api/analyze-requirements", {
             "message": message,
             "output_format": "text"
         })
-        return result.get("result", "")
+        analysis = result.get("result", "")
+        _remember_analysis(message, analysis)
+        return analysis
     except Exception as e:
         logger.error(f"Error getting requirements analysis: {str(e)}")
         return f"Error analyzing requirements: {str(e)}"
 
+async def stream_requirements_analysis(message):
+    """Yield raw requirements analysis chunks as they are generated, then cache the formatted analysis"""
+    result = {}
+    async for event in stream_fastapi_endpoint("/api/analyze-requirements/stream", {
+        "message": message,
+        "output_format": "text"
+    }):
+        kind = event.get("event")
+        if kind == "token":
+            yield event["text"]
+        elif kind == "result":
+            result = event["data"]
+        elif kind == "error":
+            raise Exception(f"API Error: {event.get('detail', 'Unknown error')}")
+    _remember_analysis(message, result.get("result", ""))
+
+def _iterate_async(agen):
+    """Drive an async generator on the session loop so synchronous code (st.write_stream) can consume it"""
+    try:
+        while True:
+            try:
+                yield run_async(agen.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        run_async(agen.aclose())
+
+def _write_stream(chunks):
+    """Draw text chunks as they arrive (st.write_stream on Streamlit versions that have it)"""
+    if hasattr(st, "write_stream"):
+        st.write_stream(chunks)
+        return
+    text = ""
+    slot = st.empty()
+    for chunk in chunks:
+        text += chunk
+        slot.markdown(text)
+
 async def direct_requirements_to_code(message):
     """
     Complete chatbot creation workflow:
@@ -553,15 +652,47 @@ async def direct_requirements_to_code(message):
     
     This enables a chatbot to create another chatbot seamlessly.
     """
-    logger.info(f"Analyzing requirements and generating code via FastAPI for: {message[:50]}...")
+    logger.info("Analyzing requirements and generating code via FastAPI for: %.50s...", message)
     
     try:
         # Use FastAPI full workflow endpoint - this orchestrates all agents
-        logger.info("Calling FastAPI /api/generate-full-project endpoint")
-        result = await call_fastapi_endpoint("/api/generate-full-project", {
+        # and streams backend/UI code as it is generated
+        logger.info("Calling FastAPI /api/generate-full-project/stream endpoint")
+        placeholders = {"backend": st.empty(), "ui": st.empty()}
+        languages = {"backend": "python", "ui": "jsx"}
+        buffers = {"backend": [], "ui": []}
+        attempts = {}
+        last_render = 0.0
+        result = {}
+        
+        async for event in stream_fastapi_endpoint("/api/generate-full-project/stream", {
             "message": message,
             "output_format": "text"
-        })
+        }):
+            kind = event.get("event")
+            if kind == "token":
+                stage = event["stage"]
+                # A retry replaces whatever the previous attempt streamed
+                if attempts.get(stage) != event["attempt"]:
+                    attempts[stage] = event["attempt"]
+                    buffers[stage] = []
+                buffers[stage].append(event["text"])
+                
+                # Redraw at most ~10 times per second
+                now = time.monotonic()
+                if now - last_render >= 0.1:
+                    last_render = now
+                    for name, placeholder in placeholders.items():
+                        if buffers[name]:
+                            placeholder.code("".join(buffers[name]), language=languages[name])
+            elif kind == "result":
+                result = event["data"]
+            elif kind == "error":
+                raise Exception(f"API Error: {event.get('detail', 'Unknown error')}")
+        
+        # The final code is rendered in the chat message instead
+        for placeholder in placeholders.values():
+            placeholder.empty()
         
         if result.get("status") != "success":
             error_msg = result.get("detail", "Unknown error")
@@ -589,31 +720,20 @@ async def direct_requirements_to_code(message):
             st.session_state.backend_url = backend_url
             st.session_state.frontend_url = frontend_url
             logger.info(f"Deployment successful - Backend: {backend_url}, Frontend: {frontend_url}")
+        elif deployment.get("status") == "in_progress":
+            # Deployment runs in the background on the API; the sidebar picks up the URLs
+            st.session_state.pending_deployment = deployment.get("deployment_id")
         
         # Format project info
         project_info_text = ""
         if project_dir and project_info.get("exists"):
             deployment_info = ""
             if st.session_state.deploy_services and backend_url and frontend_url:
-                deployment_info = f"""
-## Deployment
-Your application has been deployed and is running at:
-
-- Backend API: [{backend_url}]({backend_url})
-- Frontend UI: [{frontend_url}]({frontend_url})
-
-The services will remain running until you close this application or click "Stop Services" in the sidebar.
-"""
+                deployment_info = _DEPLOYMENT_INFO_TMPL.substitute(backend_url=backend_url, frontend_url=frontend_url)
+            elif st.session_state.deploy_services and deployment.get("status") == "in_progress":
+                deployment_info = _DEPLOYMENT_PENDING_INFO
             
-            project_info_text = f"""
-## Project Integration
-A complete project has been assembled at: `{project_dir}`
-
-- Backend code is in the `backend/` directory
-- Frontend code is in the `frontend/` directory
-- A README.md with setup instructions is included
-{deployment_info}
-"""
+            project_info_text = _PROJECT_INFO_TMPL.substitute(dir=project_dir, deployment=deployment_info)
         
         # Return results
         if ui_code and len(ui_code.strip()) > 10:
@@ -631,43 +751,30 @@ A complete project has been assembled at: `{project_dir}`
 
 def _check_if_ui_needed(requirements_json, requirements_text):
     """Check if UI generation is needed based on requirements"""
-    # Check if requirements explicitly mention UI
-    ui_keywords = ["UI", "interface", "frontend", "react", "vue", "angular", 
-                  "web page", "website", "responsive", "user interface", 
-                  "dashboard", "display", "visualization"]
-    
-    # Check in keys of the requirements JSON
-    if any(key.lower() in ["ui", "ui_components", "design", "design_preferences", 
-                          "interface", "frontend", "display"] 
-          for key in requirements_json.keys()):
-        return True
-        
-    # Check in JSON values (flattened)
-    flat_values = []
-    for values in requirements_json.values():
-        if isinstance(values, list):
-            flat_values.extend([str(v).lower() for v in values])
-        else:
-            flat_values.append(str(values).lower())
-    
-    if any(keyword.lower() in " ".join(flat_values) for keyword in ui_keywords):
-        return True
-        
-    # Check in full text
-    if requirements_text and any(keyword.lower() in requirements_text.lower() for keyword in ui_keywords):
-        return True
-        
-    return False
+    # One regex pass over the serialized requirements (keys and values) and the full text
+    requirements_dump = orjson.dumps(requirements_json, default=str).decode("utf-8")
+    return bool(_UI_RE.search(requirements_dump + " " + (requirements_text or "")))
 
-def get_agent_response(message, is_code_generation=False):
-    """Get a response via FastAPI (synchronous wrapper)"""
+def get_agent_response(message, is_code_generation=False, placeholder=None):
+    """Get a response via FastAPI (synchronous wrapper); with a placeholder, the analysis streams into it"""
     try:
-        # Call FastAPI for requirements analysis
-        result = run_async(call_fastapi_endpoint("/api/analyze-requirements", {
-            "message": message,
-            "output_format": "text"
-        }))
-        analysis = result.get("result", "")
+        # Reuse the analysis when this message was already analyzed (detection or show_analysis)
+        analysis = _cached_analysis(message)
+        if analysis is None and placeholder is not None:
+            # Show the analysis while it is generated; the formatted response replaces it
+            try:
+                with placeholder.container():
+                    _write_stream(_iterate_async(stream_requirements_analysis(message)))
+            finally:
+                placeholder.empty()
+            analysis = _cached_analysis(message) or ""
+        elif analysis is None:
+            # Call FastAPI for requirements analysis
+            result = run_async(call_fastapi_endpoint("/api/analyze-requirements", {
+                "message": message,
+                "output_format": "text"
+            }))
+            analysis = result.get("result", "")
         
         # For now, return the analysis as the response
         # You can enhance this later with a dedicated chat endpoint if needed
@@ -679,10 +786,222 @@ def get_agent_response(message, is_code_generation=False):
         logger.error(f"Error getting response from FastAPI: {str(e)}")
         return f"Error communicating with FastAPI: {str(e)}\n\nPlease ensure FastAPI is running at {API_BASE_URL}"
 
+# Chat bubble markup, kept flush-left so messages joined into one st.markdown still parse as HTML blocks
+_MESSAGE_HTML_TMPL = string.Template("""<div class="chat-message $role">
+<div class="$css_class">
+<b>$avatar $title</b>
+<br>
+$content
+</div>
+</div>
+""")
+
+# Code generation responses are split on their "## " headings; known sections get styled headings
+SECTION_TITLES = {
+    "Requirements Analysis": "<h2>Requirements Analysis</h2>",
+    "Generated Code": "<h2>Generated Code</h2>",
+    "Generated Backend Code": '<h2 class="backend-heading">Generated Backend Code</h2>',
+    "Generated Backend Code (Python)": '<h2 class="backend-heading">Generated Backend Code (Python)</h2>',
+    "Generated UI Code": '<h2 class="ui-heading">Generated UI Code</h2>',
+    "Generated Frontend UI (React)": '<h2 class="ui-heading">Generated Frontend UI (React)</h2>',
+}
+# Longest titles first so "Generated Backend Code (Python)" isn't cut short at "Generated Backend Code"
+_SECTION_SPLIT_RE = re.compile(
+    r"^## (%s)?" % "|".join(map(re.escape, sorted(SECTION_TITLES, key=len, reverse=True))), re.M
+)
+
+_AVATARS = {"user": "🧑‍💻", "assistant": "🤖"}  # Anything else is a requirements analysis system message
+
+def _format_message_html(message):
+    """Build the chat bubble HTML for one message"""
+    role = message["role"]
+    avatar = _AVATARS.get(role, "🔎")
+    content = message["content"]
+    css_class = "message"
+    title = role.title()
+    
+    if role == "user" and message.get("documents"):
+        # User messages with document attachments
+        doc_badges = " ".join([f"📎 {doc}" for doc in message.get("documents", [])])
+        content = f"{content}\n\n<div style='margin-top: 0.5rem; font-size: 0.85em; opacity: 0.8;'>{doc_badges}</div>"
+    elif role == "system" and "Requirements Analysis" in content:
+        # Special handling for requirements analysis (system messages)
+        css_class = "message requirements-analysis"
+        title = "Requirements Analysis"
+        content = content.replace("**Requirements Analysis:**", "", 1).strip()
+    elif role == "assistant" and "```" in content and "## Requirements Analysis" in content and (
+            "## Generated Code" in content or "## Generated Backend Code" in content):
+        # This is a code generation result, use special formatting
+        css_class = "message code-generation-output"
+        parts = _SECTION_SPLIT_RE.split(content)
+        formatted = [parts[0]]
+        for section, body in zip(parts[1::2], parts[2::2]):
+            if section:
+                formatted.append(f"{SECTION_TITLES[section]}\n{body.strip()}\n")
+            else:
+                # Any other section keeps its markdown heading
+                formatted.append(f"## {body}")
+        content = "".join(formatted)
+    
+    return _MESSAGE_HTML_TMPL.substitute(role=role, css_class=css_class, avatar=avatar, title=title, content=content)
+
+# Only the most recent messages stay in session state; older ones are spooled to a per-session JSONL archive
+CHAT_WINDOW_SIZE = 50
+CHAT_ARCHIVE_PAGE_SIZE = 20
+CHAT_ARCHIVE_DIR = os.path.expanduser(os.getenv("CHAT_ARCHIVE_DIR", "~/.mob/chat_archive"))
+
+def _archive_path():
+    return os.path.join(CHAT_ARCHIVE_DIR, f"{st.session_state.user_id}.jsonl")
+
+def append_message(message):
+    """Add a message to the chat, archiving the oldest ones beyond CHAT_WINDOW_SIZE"""
+    # Format once here; reruns only join the stored HTML
+    message["_html"] = _format_message_html(message)
+    messages = st.session_state.messages
+    messages.append(message)
+    
+    if len(messages) > CHAT_WINDOW_SIZE:
+        evicted = messages[:len(messages) - CHAT_WINDOW_SIZE]
+        del messages[:len(evicted)]
+        try:
+            os.makedirs(CHAT_ARCHIVE_DIR, exist_ok=True)
+            with open(_archive_path(), "ab") as f:
+                f.writelines(orjson.dumps(m) + b"\n" for m in evicted)
+            st.session_state.archived_count = st.session_state.get("archived_count", 0) + len(evicted)
+        except OSError as e:
+            logger.warning(f"Could not archive chat history: {str(e)}")
+    
+    unsaved = st.session_state.get("unsaved_messages", 0) + 1
+    if unsaved >= CHAT_SNAPSHOT_EVERY:
+        _save_chat_snapshot()
+        unsaved = 0
+    st.session_state.unsaved_messages = unsaved
+
+def _read_tail_lines(path, count, block_size=65536):
+    """Read the last count lines of a file by seeking back from the end in blocks"""
+    with open(path, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        data = b""
+        # One more newline than lines wanted guarantees the oldest of them is complete
+        while end > 0 and data.count(b"\n") <= count:
+            start = max(0, end - block_size)
+            f.seek(start)
+            data = f.read(end - start) + data
+            end = start
+    return data.splitlines()[-count:]
+
+def load_archived_messages(count):
+    """Read the newest count archived messages (oldest first)"""
+    if not count:
+        return []
+    path = _archive_path()
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return []
+    # Reruns show the same page until the archive changes, so reuse the parsed messages
+    key = (path, mtime, count)
+    cached = st.session_state.get("archive_page")
+    if cached and cached[0] == key:
+        return cached[1]
+    try:
+        messages = [orjson.loads(line) for line in _read_tail_lines(path, count)]
+    except OSError:
+        return []
+    st.session_state.archive_page = (key, messages)
+    return messages
+
+def clear_chat_history():
+    """Drop the chat window, the on-disk archive and the saved snapshot"""
+    st.session_state.messages = []
+    st.session_state.archived_count = 0
+    st.session_state.archive_offset = 0
+    for path in (_archive_path(), _chat_state_path()):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+# The chat window is saved every CHAT_SNAPSHOT_EVERY messages and resumed when the browser tab is
+# reloaded. Each browser gets its own chat id, kept in the page URL (?chat=...), and its own snapshot file
+CHAT_STATE_DIR = os.path.expanduser(os.getenv("CHAT_STATE_DIR", "~/.mob/chat_state"))
+CHAT_SNAPSHOT_EVERY = 5
+_CHAT_ID_RE = re.compile(r"[0-9a-f]{32}")
+
+def _chat_state_path():
+    return os.path.join(CHAT_STATE_DIR, f"{st.session_state.user_id}.json")
+
+def _save_chat_snapshot():
+    snapshot = {
+        "messages": st.session_state.messages,
+        "archived_count": st.session_state.get("archived_count", 0),
+    }
+    try:
+        os.makedirs(CHAT_STATE_DIR, exist_ok=True)
+        path = _chat_state_path()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(snapshot))
+        os.replace(tmp_path, path)
+    except (OSError, TypeError) as e:
+        logger.warning(f"Could not save chat snapshot: {str(e)}")
+
+def _load_chat_snapshot():
+    try:
+        with open(_chat_state_path(), "rb") as f:
+            snapshot = orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    return snapshot if isinstance(snapshot, dict) else None
+
+# Resume this browser's chat once per new session (needs st.query_params, Streamlit 1.30+)
+if not st.session_state.get("chat_restored"):
+    st.session_state.chat_restored = True
+    query_params = getattr(st, "query_params", None)
+    if query_params is not None:
+        chat_id = query_params.get("chat", "")
+        if _CHAT_ID_RE.fullmatch(chat_id):
+            st.session_state.user_id = f"user_{chat_id}"
+            snapshot = _load_chat_snapshot()
+            if snapshot and isinstance(snapshot.get("messages"), list):
+                st.session_state.messages = snapshot["messages"]
+                st.session_state.archived_count = snapshot.get("archived_count", 0)
+                logger.info(f"Resumed chat with {len(st.session_state.messages)} messages")
+        else:
+            query_params["chat"] = st.session_state.user_id[len("user_"):]
+
+# How long a sidebar status check is reused across reruns and sessions (seconds)
+STATUS_TTL = 15
+
+async def _fastapi_status(url, client):
+    """Check the FastAPI health endpoint; returns (healthy, error)"""
+    try:
+        response = await client.get(f"{url}/health", timeout=1.0)
+        return response.status_code == 200, None
+    except Exception as e:
+        return False, str(e)
+
+async def _ollama_status(url, client):
+    """Check the Ollama server; returns (status_code, error)"""
+    try:
+        return (await client.get(url, timeout=1.0)).status_code, None
+    except Exception as e:
+        return None, str(e)
+
+@st.cache_data(ttl=STATUS_TTL, show_spinner=False)
+def _service_status(api_url, ollama_url, _client):
+    """Probe FastAPI and Ollama concurrently; returns ((healthy, error), (status_code, error))"""
+    async def probe_all():
+        return await asyncio.gather(_fastapi_status(api_url, _client), _ollama_status(ollama_url, _client))
+    return tuple(run_async(probe_all()))
+
 # Main application header
 st.title("🤖 Mother of Bots - Multi-Agent Chat Interface")
 st.subheader(f"Using {OLLAMA_MODEL} via LangChain 🦜️")
 
+# One batch of status probes per rerun, shared by the sidebar sections below
+(api_healthy, api_error), (ollama_code, ollama_error) = _service_status(API_BASE_URL, OLLAMA_URL, st.session_state.http)
+
 # Sidebar with info and controls
 with st.sidebar:
     st.markdown("## About")
@@ -695,18 +1014,12 @@ with st.sidebar:
     
     st.markdown("## FastAPI Status")
     api_status = st.empty()
-    try:
-        async def check_api():
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get(f"{API_BASE_URL}/health")
-                return response.status_code == 200
-        api_healthy = run_async(check_api())
-        if api_healthy:
-            api_status.success(f"✅ FastAPI is running at {API_BASE_URL}")
-        else:
-            api_status.error(f"❌ FastAPI not responding at {API_BASE_URL}")
-    except Exception as e:
-        api_status.error(f"❌ Cannot connect to FastAPI: {str(e)}")
+    if api_healthy:
+        api_status.success(f"✅ FastAPI is running at {API_BASE_URL}")
+    elif not api_error:
+        api_status.error(f"❌ FastAPI not responding at {API_BASE_URL}")
+    else:
+        api_status.error(f"❌ Cannot connect to FastAPI: {api_error}")
         st.warning(f"Please ensure FastAPI is running:\n`uvicorn mother_of_bots.api:app --reload`")
     
     st.markdown("## Interface Settings")
@@ -728,6 +1041,32 @@ with st.sidebar:
     if deploy_services != st.session_state.deploy_services:
         st.session_state.deploy_services = deploy_services
     
+    # Pick up the URLs of a deployment still running in the background
+    if st.session_state.pending_deployment:
+        try:
+            deployment = run_async(st.session_state.http.get(
+                f"{API_BASE_URL}/api/deployment-status",
+                params={"deployment_id": st.session_state.pending_deployment},
+                timeout=2.0
+            )).json()
+        except Exception as e:
+            logger.warning(f"Could not check deployment status: {str(e)}")
+            deployment = {"status": "in_progress"}
+        
+        if deployment.get("status") == "in_progress":
+            st.markdown("## Deployed Services")
+            st.info("Deployment in progress…")
+            if st.button("Check again"):
+                st.rerun()
+        else:
+            st.session_state.pending_deployment = None
+            if deployment.get("backend_url") and deployment.get("frontend_url"):
+                st.session_state.backend_url = deployment["backend_url"]
+                st.session_state.frontend_url = deployment["frontend_url"]
+                logger.info(f"Deployment successful - Backend: {deployment['backend_url']}, Frontend: {deployment['frontend_url']}")
+            else:
+                st.error(f"Deployment failed: {deployment.get('message') or deployment.get('detail', 'unknown error')}")
+    
     # Add a section to show deployed services if available
     if st.session_state.backend_url and st.session_state.frontend_url:
         st.markdown("## Deployed Services")
@@ -771,23 +1110,21 @@ with st.sidebar:
     ollama_status = st.empty()
     
     # Check Ollama connection
-    try:
-        import requests
-        try:
-            response = requests.get(f"{OLLAMA_URL}")
-            if response.status_code == 200:
-                ollama_status.success(f"Ollama is running at {OLLAMA_URL}")
-            else:
-                ollama_status.error(f"Ollama server error: Status {response.status_code}")
-        except Exception as e:
-            ollama_status.error(f"Cannot connect to Ollama: {str(e)}")
-    except ImportError:
-        st.error("Requests library not installed. Cannot check Ollama status.")
+    if ollama_error:
+        ollama_status.error(f"Cannot connect to Ollama: {ollama_error}")
+    elif ollama_code == 200:
+        ollama_status.success(f"Ollama is running at {OLLAMA_URL}")
+    else:
+        ollama_status.error(f"Ollama server error: Status {ollama_code}")
+    
+    # Status checks are cached for STATUS_TTL seconds; the callback runs before the rerun re-probes
+    st.button("Refresh status", on_click=_service_status.clear,
+              help=f"Re-check FastAPI and Ollama now instead of waiting up to {STATUS_TTL}s")
     
     
     st.markdown("## Settings")
     if st.button("Reset Conversation"):
-        st.session_state.messages = []
+        clear_chat_history()
         st.rerun()
     
     # Code Generation info
@@ -834,110 +1171,31 @@ if not st.session_state.agent_running:
         st.error(f"Failed to initialize agent: {str(e)}")
         logger.error(f"Agent initialization error: {str(e)}")
 
+# st.fragment reruns only the decorated function; older Streamlit versions just run it inline
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
+
+@_fragment
+def render_messages():
+    """Display the chat history from the HTML stored on each message when it was appended"""
+    messages = st.session_state.messages
+    if messages:
+        st.markdown("\n".join(m.get("_html") or _format_message_html(m) for m in messages), unsafe_allow_html=True)
+
+# Page older messages back in from the archive (display only; the session window stays bounded)
+archived_count = st.session_state.get("archived_count", 0)
+if archived_count:
+    archive_offset = st.session_state.get("archive_offset", 0)
+    if archive_offset < archived_count and st.button(f"Load older messages ({archived_count - archive_offset} archived)"):
+        archive_offset = st.session_state.archive_offset = min(archived_count, archive_offset + CHAT_ARCHIVE_PAGE_SIZE)
+    if archive_offset:
+        older = load_archived_messages(archive_offset)
+        st.markdown("\n".join(m.get("_html") or _format_message_html(m) for m in older), unsafe_allow_html=True)
+
 # Display chat messages
-for i, message in enumerate(st.session_state.messages):
-    if message["role"] == "user":
-        avatar = "🧑‍💻"
-    elif message["role"] == "assistant":
-        avatar = "🤖"
-    else:  # system message for requirements analysis
-        avatar = "🔎"
-        
-    with st.container():
-        # Display user messages with document attachments
-        if message["role"] == "user" and message.get("documents"):
-            doc_badges = " ".join([f"📎 {doc}" for doc in message.get("documents", [])])
-            message_content = f"{message['content']}\n\n<div style='margin-top: 0.5rem; font-size: 0.85em; opacity: 0.8;'>{doc_badges}</div>"
-            st.markdown(f"""
-            <div class="chat-message {message['role']}">
-                <div class="message">
-                    <b>{avatar} {message['role'].title()}</b>
-                    <br>
-                    {message_content}
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-            continue
-        
-        # Special handling for requirements analysis (system messages)
-        if message["role"] == "system" and "Requirements Analysis" in message["content"]:
-            st.markdown(f"""
-            <div class="chat-message system">
-                <div class="message requirements-analysis">
-                    <b>{avatar} Requirements Analysis</b>
-                    <br>
-                    {message["content"].replace("**Requirements Analysis:**", "", 1).strip()}
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-        # Special handling for code blocks in assistant messages
-        elif message["role"] == "assistant" and "```" in message["content"]:
-            # Format code blocks for better display
-            content = message["content"]
-            
-            # Check if this is a code generation result with markdown headers
-            if "## Requirements Analysis" in content and ("## Generated Code" in content or "## Generated Backend Code" in content):
-                # This is a code generation result, use special formatting
-                parts = content.split("## ")
-                formatted_content = ""
-                
-                for part in parts:
-                    if part.strip():
-                        if part.startswith("Requirements Analysis"):
-                            # Format requirements section
-                            section_title = "Requirements Analysis"
-                            section_content = part.replace("Requirements Analysis", "", 1).strip()
-                            formatted_content += f'<h2>{section_title}</h2>\n{section_content}\n'
-                        elif part.startswith("Generated Code"):
-                            # Format code section
-                            section_title = "Generated Code"
-                            section_content = part.replace("Generated Code", "", 1).strip()
-                            formatted_content += f'<h2>{section_title}</h2>\n{section_content}\n'
-                        elif part.startswith("Generated Backend Code"):
-                            # Format backend code section
-                            section_title = "Generated Backend Code"
-                            section_content = part.replace("Generated Backend Code", "", 1).strip()
-                            formatted_content += f'<h2>{section_title}</h2>\n{section_content}\n'
-                        elif part.startswith("Generated UI Code"):
-                            # Format UI code section
-                            section_title = "Generated UI Code"
-                            section_content = part.replace("Generated UI Code", "", 1).strip()
-                            formatted_content += f'<h2>{section_title}</h2>\n{section_content}\n'
-                        else:
-                            # Regular content
-                            formatted_content += part
-                
-                st.markdown(f"""
-                <div class="chat-message assistant">
-                    <div class="message code-generation-output">
-                        <b>{avatar} {message["role"].title()}</b>
-                        <br>
-                        {formatted_content}
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-            else:
-                # Regular message with code blocks, just display normally
-                st.markdown(f"""
-                <div class="chat-message {message["role"]}">
-                    <div class="message">
-                        <b>{avatar} {message["role"].title()}</b>
-                        <br>
-                        {content}
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-        else:
-            # Regular message display
-            st.markdown(f"""
-            <div class="chat-message {message["role"]}">
-                <div class="message">
-                    <b>{avatar} {message["role"].title()}</b>
-                    <br>
-                    {message["content"]}
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+render_messages()
+
+# Messages added during this turn are drawn here, right below the history and above the uploader
+turn_messages = st.container()
 
 # File uploader section
 st.markdown("### 📎 Upload Documents")
@@ -1035,23 +1293,23 @@ if user_input and not st.session_state.waiting_for_response:
         "content": user_input,
         "documents": attached_docs
     }
-    st.session_state.messages.append(message_data)
+    append_message(message_data)
+    st.session_state.last_user_message = message_data  # Read back directly when the response is processed
+    
+    # Display the user message now and answer it in this same script run (no rerun round-trip)
+    turn_messages.markdown(message_data["_html"], unsafe_allow_html=True)
     
     # Set waiting flag
     st.session_state.waiting_for_response = True
-    
-    # Rerun to display user message immediately
-    st.rerun()
 
-# Process response (after rerun)
+# Process response
 if st.session_state.waiting_for_response:
     # Force garbage collection before processing to free memory
     gc.collect()
     
     with st.status("Processing...", expanded=True) as status:
         # Get the last user message with document context
-        last_user_message_obj = next((msg for msg in reversed(st.session_state.messages) 
-                                     if msg["role"] == "user"), None)
+        last_user_message_obj = st.session_state.get("last_user_message")
         
         if last_user_message_obj:
             last_user_message = last_user_message_obj["content"]
@@ -1087,39 +1345,33 @@ if st.session_state.waiting_for_response:
         else:
             last_user_message = ""
         
-        # Determine if this is a code generation request
-        code_keywords = ["generate code", "create code", "write code", "code for", "generate a program", 
-                         "build an application", "develop a system", "create an app", "write a program",
-                         "script for", "implement a solution", "code that can", "build a website",
-                         "create a function", "make an algorithm"]
+        # Determine if this is a code generation request (explicit code generation keywords)
+        is_code_request = _CODE_KEYWORDS_RE.search(last_user_message.lower()) is not None
         
-        # First check if there are explicit code generation keywords
-        is_code_request = any(keyword in last_user_message.lower() for keyword in code_keywords)
+        # Greetings and quick follow-ups skip the (slow) requirements analysis entirely
+        stripped_message = last_user_message.strip()
+        is_chit_chat = (not is_code_request and len(stripped_message) < CHIT_CHAT_MAX_LENGTH
+                        and _CHIT_CHAT_RE.match(stripped_message) is not None)
         
         # If not explicitly a code request, do a more thorough analysis
-        if not is_code_request and st.session_state.auto_generate_code:
+        if not is_code_request and not is_chit_chat and st.session_state.auto_generate_code:
             try:
                 # Get full requirements analysis
                 req_analysis = run_async(get_requirements_analysis(last_user_message))
                 
-                # Look for code-related keywords in the requirements analysis
-                code_indicator_phrases = ["code", "program", "application", "function", "module", "class", 
-                                         "API", "endpoint", "system", "backend", "frontend", "algorithm",
-                                         "software", "app", "website", "interface", "database"]
-                
-                is_likely_code_request = any(indicator in req_analysis.lower() for indicator in code_indicator_phrases)
+                # Tokenize the requirements analysis once and intersect with the keyword sets
+                req_tokens = set(_WORD_RE.findall(req_analysis.lower()))
                 
                 # Count the number of indicators found to determine confidence
-                indicator_count = sum(1 for indicator in code_indicator_phrases if indicator in req_analysis.lower())
+                indicator_count = len({CODE_INDICATOR_FORMS[token] for token in req_tokens & CODE_INDICATOR_FORMS.keys()})
                 
                 # If at least 2 code indicators are found, treat as a code request
-                if is_likely_code_request and indicator_count >= 2:
-                    logger.info(f"Requirements analysis suggests this is a code-related request (found {indicator_count} indicators)")
+                if indicator_count >= 2:
+                    logger.info("Requirements analysis suggests this is a code-related request (found %d indicators)", indicator_count)
                     is_code_request = True
                     
                 # Also check for specific requirement categories that suggest code generation
-                if "functionalities" in req_analysis.lower() and any(tech in req_analysis.lower() 
-                                                                 for tech in ["python", "javascript", "java", "api", "database"]):
+                if "functionalities" in req_tokens and req_tokens & TECH_TOKENS:
                     logger.info("Requirements mention technical functionalities, treating as code request")
                     is_code_request = True
             except Exception as e:
@@ -1214,7 +1466,7 @@ Please try again or simplify your request.
 """
             else:
                 # Regular chat path with separate requirements analysis
-                if st.session_state.show_analysis:
+                if st.session_state.show_analysis and not is_chit_chat:
                     st.write("Step 1: Analyzing requirements using LangChain...")
                     status.update(label="Analyzing requirements with LangChain...", state="running")
                     
@@ -1222,23 +1474,25 @@ Please try again or simplify your request.
                     requirements_analysis = run_async(get_requirements_analysis(last_user_message))
                     
                     # Add system message for requirements analysis
-                    st.session_state.messages.append({
+                    analysis_message = {
                         "role": "system", 
                         "content": f"**Requirements Analysis:**\n\n{requirements_analysis}"
-                    })
+                    }
+                    append_message(analysis_message)
+                    # Show the analysis before generating the response, without a rerun
+                    turn_messages.markdown(analysis_message["_html"], unsafe_allow_html=True)
                     
-                    # Update status for a temporary pause to show analysis
+                    # Non-blocking notice instead of pausing the script to show the analysis
                     status.update(label="Analysis complete", state="complete")
-                    time.sleep(0.5)  # Small pause to let user see the analysis
-                    st.rerun()  # Rerun to show the analysis before generating response
+                    st.toast("Analysis complete", icon="✅")
                 
-                # Generate regular response
+                # Generate regular response, streamed into the turn as it is produced
                 st.write("Generating response using LangChain...")
                 status.update(label="Generating response with LangChain...", state="running")
-                response = get_agent_response(last_user_message)
+                response = get_agent_response(last_user_message, placeholder=turn_messages.empty())
             
             # Add bot message to chat
-            st.session_state.messages.append({"role": "assistant", "content": response})
+            append_message({"role": "assistant", "content": response})
             
             if is_code_request and st.session_state.auto_generate_code:
                 status.update(label="Code generation complete!", state="complete", expanded=False)
@@ -1247,15 +1501,15 @@ Please try again or simplify your request.
         except Exception as e:
             st.error(f"Error generating response: {str(e)}")
             logger.error(f"Response generation error: {str(e)}")
-            st.session_state.messages.append({"role": "assistant", "content": f"I'm sorry, I encountered an error: {str(e)}"})
+            append_message({"role": "assistant", "content": f"I'm sorry, I encountered an error: {str(e)}"})
         finally:
             # Reset waiting flag
             st.session_state.waiting_for_response = False
             # Force garbage collection after processing
             gc.collect()
     
-    # Rerun to display bot message
-    st.rerun()
+    # Display the bot message (the next rerun renders it from the history cache)
+    turn_messages.markdown(st.session_state.messages[-1]["_html"], unsafe_allow_html=True)
 
 # Register a cleanup function
 def cleanup():